@@ -13,10 +13,12 @@ Usage:
     python test_api.py
 """
 
-import requests
+import asyncio
 import json
 import os
 
+import aiohttp
+
 # Replace with your API Gateway URL
 API_BASE_URL = os.getenv("API_BASE_URL", "https://your-api-id.execute-api.region.amazonaws.com/Prod")
 
@@ -29,7 +31,19 @@ HEADERS = {
     "Authorization": f"Bearer {ACCESS_TOKEN}"
 }
 
-def test_create_alert():
+
+async def _report(label, response):
+    """Print a response and return its JSON body (None on error)"""
+    print(f"\n{label}: {response.status}")
+    if response.status not in (200, 201):
+        print(f"Error: {await response.text()}")
+        return None
+    body = await response.json()
+    print(json.dumps(body, indent=2))
+    return body
+
+
+async def test_create_alert(session):
     """Test creating an alert"""
     url = f"{API_BASE_URL}/api/v1/alerts"
     # Note: user_id and telegram_chat_id are automatically set from authenticated user
@@ -41,92 +55,72 @@ def test_create_alert():
         "condition": "below",
         "rate_type": "TTS"  # TTS, TTB, or DEAL_BAS_R
     }
-    
-    response = requests.post(url, json=data, headers=HEADERS)
-    print(f"Create Alert: {response.status_code}")
-    if response.status_code != 201:
-        print(f"Error: {response.text}")
-        return None
-    print(json.dumps(response.json(), indent=2))
-    return response.json().get('alert_id')
 
-def test_list_alerts():
+    async with session.post(url, json=data) as response:
+        body = await _report("Create Alert", response)
+    return body.get('alert_id') if body else None
+
+
+async def test_list_alerts(session):
     """Test listing alerts"""
-    url = f"{API_BASE_URL}/api/v1/alerts"
-    response = requests.get(url, headers=HEADERS)
-    print(f"\nList Alerts: {response.status_code}")
-    if response.status_code != 200:
-        print(f"Error: {response.text}")
-        return
-    print(json.dumps(response.json(), indent=2))
-
-def test_get_alert(alert_id):
+    async with session.get(f"{API_BASE_URL}/api/v1/alerts") as response:
+        await _report("List Alerts", response)
+
+
+async def test_get_alert(session, alert_id):
     """Test getting a specific alert"""
-    url = f"{API_BASE_URL}/api/v1/alerts/{alert_id}"
-    response = requests.get(url, headers=HEADERS)
-    print(f"\nGet Alert: {response.status_code}")
-    if response.status_code != 200:
-        print(f"Error: {response.text}")
-        return
-    print(json.dumps(response.json(), indent=2))
-
-def test_toggle_alert(alert_id):
+    async with session.get(f"{API_BASE_URL}/api/v1/alerts/{alert_id}") as response:
+        await _report("Get Alert", response)
+
+
+async def test_toggle_alert(session, alert_id):
     """Test toggling an alert"""
-    url = f"{API_BASE_URL}/api/v1/alerts/{alert_id}/toggle"
-    response = requests.put(url, headers=HEADERS)
-    print(f"\nToggle Alert: {response.status_code}")
-    if response.status_code != 200:
-        print(f"Error: {response.text}")
-        return
-    print(json.dumps(response.json(), indent=2))
-
-def test_update_alert(alert_id):
+    async with session.put(f"{API_BASE_URL}/api/v1/alerts/{alert_id}/toggle") as response:
+        await _report("Toggle Alert", response)
+
+
+async def test_update_alert(session, alert_id):
     """Test updating an alert"""
-    url = f"{API_BASE_URL}/api/v1/alerts/{alert_id}"
     data = {
         "target_rate": 1350.0,
         "condition": "above"
     }
-    response = requests.put(url, json=data, headers=HEADERS)
-    print(f"\nUpdate Alert: {response.status_code}")
-    if response.status_code != 200:
-        print(f"Error: {response.text}")
-        return
-    print(json.dumps(response.json(), indent=2))
-
-def test_delete_alert(alert_id):
+    async with session.put(f"{API_BASE_URL}/api/v1/alerts/{alert_id}", json=data) as response:
+        await _report("Update Alert", response)
+
+
+async def test_delete_alert(session, alert_id):
     """Test deleting an alert"""
-    url = f"{API_BASE_URL}/api/v1/alerts/{alert_id}"
-    response = requests.delete(url, headers=HEADERS)
-    print(f"\nDelete Alert: {response.status_code}")
-    if response.status_code != 200:
-        print(f"Error: {response.text}")
-        return
-    print(json.dumps(response.json(), indent=2))
+    async with session.delete(f"{API_BASE_URL}/api/v1/alerts/{alert_id}") as response:
+        await _report("Delete Alert", response)
 
-if __name__ == "__main__":
+
+async def main():
     print("Testing Currency Alert API\n")
     print("=" * 50)
-    
-    # Create an alert
-    alert_id = test_create_alert()
-    
-    if alert_id:
-        # List all alerts
-        test_list_alerts()
-        
-        # Get specific alert
-        test_get_alert(alert_id)
-        
-        # Update alert
-        test_update_alert(alert_id)
-        
-        # Toggle alert
-        test_toggle_alert(alert_id)
-        
-        # Toggle back
-        test_toggle_alert(alert_id)
-        
-        # Delete alert
-        # test_delete_alert(alert_id)
 
+    # One session so every call reuses the same keep-alive connection
+    async with aiohttp.ClientSession(headers=HEADERS) as session:
+        # Create an alert
+        alert_id = await test_create_alert(session)
+
+        if alert_id:
+            # List all alerts and get the new one concurrently (both read-only)
+            await asyncio.gather(
+                test_list_alerts(session),
+                test_get_alert(session, alert_id),
+            )
+
+            # Update alert
+            await test_update_alert(session, alert_id)
+
+            # Toggle alert, then toggle back (sequential: each depends on the last state)
+            await test_toggle_alert(session, alert_id)
+            await test_toggle_alert(session, alert_id)
+
+            # Delete alert
+            # await test_delete_alert(session, alert_id)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
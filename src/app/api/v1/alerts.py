@@ -2,17 +2,22 @@
 Alert API endpoints
 """
 from typing import Optional
-from fastapi import APIRouter, HTTPException, Depends, Query
+
+import msgspec
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 
 from app.core.dependencies import get_alert_repository_dependency, get_current_user
 from app.db.repositories import AlertRepository
-from app.services.alert_service import AlertService
+from app.services.alert_service import AlertService, AlertNotFoundError, AlertAccessDeniedError
+from app.db.models.alert import Alert
 from app.db.models.user import User
 from app.schemas.alert import (
     AlertCreate,
     AlertResponse,
     AlertUpdate,
     AlertListResponse,
+    AlertListResponseStruct,
+    AlertResponseStruct,
     MessageResponse,
 )
 
@@ -26,6 +31,20 @@ def get_alert_service(
     return AlertService(repository)
 
 
+def _json_response(payload: msgspec.Struct, status_code: int = 200) -> Response:
+    """Encode a response Struct directly, skipping response_model re-validation.
+
+    Alerts reaching the handlers were built by our own service layer, so the
+    route's response_model is kept for the OpenAPI schema only.
+    """
+    return Response(content=msgspec.json.encode(payload), status_code=status_code, media_type="application/json")
+
+
+def _alert_payload(alert: Alert) -> AlertResponseStruct:
+    """Project a domain alert onto the response Struct"""
+    return AlertResponseStruct(**alert.to_response_dict())
+
+
 @router.post("", response_model=AlertResponse, status_code=201)
 async def create_alert(
     alert_data: AlertCreate,
@@ -40,7 +59,7 @@ async def create_alert(
         # KoreaExim API uses KRW as base, so base_currency is always KRW
         alert_data.base_currency = "KRW"
         alert = await service.create_alert(alert_data)
-        return AlertResponse(**alert.to_dict())
+        return _json_response(_alert_payload(alert), status_code=201)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create alert: {str(e)}")
 
@@ -48,17 +67,23 @@ async def create_alert(
 @router.get("", response_model=AlertListResponse)
 async def list_alerts(
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Maximum number of alerts to return"),
+    cursor: Optional[str] = Query(None, description="Cursor returned by the previous page"),
     current_user: User = Depends(get_current_user),
     service: AlertService = Depends(get_alert_service),
 ):
     """List alerts for the authenticated user"""
     try:
         # Only show alerts for the current user
-        alerts = await service.list_alerts(user_id=current_user.user_id, is_active=is_active)
-        return AlertListResponse(
-            alerts=[AlertResponse(**alert.to_dict()) for alert in alerts],
+        alerts, next_cursor = await service.list_user_alerts(
+            current_user.user_id, is_active=is_active, limit=limit, cursor=cursor
+        )
+        payload = AlertListResponseStruct(
+            alerts=[_alert_payload(alert) for alert in alerts],
             total=len(alerts),
+            next_cursor=next_cursor,
         )
+        return _json_response(payload)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list alerts: {str(e)}")
 
@@ -75,7 +100,7 @@ async def get_alert(
         raise HTTPException(status_code=404, detail="Alert not found")
     if alert.user_id != current_user.user_id:
         raise HTTPException(status_code=403, detail="Not authorized to access this alert")
-    return AlertResponse(**alert.to_dict())
+    return _json_response(_alert_payload(alert))
 
 
 @router.put("/{alert_id}", response_model=AlertResponse)
@@ -86,16 +111,13 @@ async def update_alert(
     service: AlertService = Depends(get_alert_service),
 ):
     """Update an alert (only if it belongs to the authenticated user)"""
-    alert = await service.get_alert(alert_id)
-    if not alert:
+    try:
+        alert = await service.update_alert(alert_id, current_user.user_id, update_data)
+    except AlertNotFoundError:
         raise HTTPException(status_code=404, detail="Alert not found")
-    if alert.user_id != current_user.user_id:
+    except AlertAccessDeniedError:
         raise HTTPException(status_code=403, detail="Not authorized to update this alert")
-    
-    alert = await service.update_alert(alert_id, update_data)
-    if not alert:
-        raise HTTPException(status_code=404, detail="Alert not found")
-    return AlertResponse(**alert.to_dict())
+    return _json_response(_alert_payload(alert))
 
 
 @router.delete("/{alert_id}", response_model=MessageResponse)
@@ -105,15 +127,12 @@ async def delete_alert(
     service: AlertService = Depends(get_alert_service),
 ):
     """Delete an alert (only if it belongs to the authenticated user)"""
-    alert = await service.get_alert(alert_id)
-    if not alert:
+    try:
+        await service.delete_alert(alert_id, current_user.user_id)
+    except AlertNotFoundError:
         raise HTTPException(status_code=404, detail="Alert not found")
-    if alert.user_id != current_user.user_id:
+    except AlertAccessDeniedError:
         raise HTTPException(status_code=403, detail="Not authorized to delete this alert")
-    
-    success = await service.delete_alert(alert_id)
-    if not success:
-        raise HTTPException(status_code=404, detail="Alert not found")
     return MessageResponse(message="Alert deleted successfully")
 
 
@@ -124,14 +143,10 @@ async def toggle_alert(
     service: AlertService = Depends(get_alert_service),
 ):
     """Toggle alert active status (only if it belongs to the authenticated user)"""
-    alert = await service.get_alert(alert_id)
-    if not alert:
+    try:
+        alert = await service.toggle_alert(alert_id, current_user.user_id)
+    except AlertNotFoundError:
         raise HTTPException(status_code=404, detail="Alert not found")
-    if alert.user_id != current_user.user_id:
+    except AlertAccessDeniedError:
         raise HTTPException(status_code=403, detail="Not authorized to toggle this alert")
-    
-    alert = await service.toggle_alert(alert_id)
-    if not alert:
-        raise HTTPException(status_code=404, detail="Alert not found")
-    return AlertResponse(**alert.to_dict())
-
+    return _json_response(_alert_payload(alert))
@@ -1,7 +1,6 @@
 """
 Authentication API endpoints
 """
-from datetime import timedelta
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import OAuth2PasswordRequestForm
 
@@ -57,7 +56,7 @@ async def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token_expires = settings.ACCESS_TOKEN_EXPIRE_DELTA
     access_token = create_access_token(
         data={"sub": user.user_id, "email": user.email},
         expires_delta=access_token_expires
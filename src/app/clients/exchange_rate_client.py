@@ -1,13 +1,76 @@
 """
 Korea Export-Import Bank (KoreaExim) Exchange Rate API Client
 """
+import asyncio
+import operator
 import os
-import requests
+import ssl
+import time
 import certifi
+import httpx
+import orjson
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 
+# Rates are published a few times a day, so a short TTL is safe
+_CACHE_TTL_SECONDS = 300
+
+# Retry policy for transient upstream failures
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_MAX_RETRIES = 2
+_BACKOFF_FACTOR = 0.2
+
+# Thousands separators (and stray spaces) dropped before float()
+_COMMA_STRIP = str.maketrans("", "", ", ")
+
+# rate_type -> ExchangeRate field accessor
+_RATE_ATTR = {
+    "TTS": operator.attrgetter("tts"),
+    "TTB": operator.attrgetter("ttb"),
+    "DEAL_BAS_R": operator.attrgetter("deal_bas_r"),
+}
+
+
+def _rate_getter(rate_type: str):
+    """Return the field accessor for rate_type"""
+    try:
+        return _RATE_ATTR[rate_type]
+    except KeyError:
+        raise ValueError(f"Invalid rate_type: {rate_type}. Must be TTS, TTB, or DEAL_BAS_R")
+
+
+# Built once: loading the CA bundle is a multi-megabyte PEM parse
+_SSL_CTX = ssl.create_default_context(cafile=certifi.where())
+
+# Shared by every client instance so warm Lambda containers keep their
+# pooled keep-alive (HTTP/2 where negotiated) connections to KoreaExim
+# between invocations. Pooled connections are bound to the loop they were
+# opened on, so the client must only be driven from fetch_rates'
+# container-wide event loop
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client, creating it on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            timeout=10.0,
+            verify=_SSL_CTX,
+            limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared HTTP client"""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
 
 @dataclass
 class ExchangeRate:
@@ -32,8 +95,34 @@ class KoreaEximExchangeRateClient:
         self.authkey = authkey or os.environ.get('KOREAEXIM_AUTHKEY', '')
         if not self.authkey:
             raise ValueError("KoreaExim authkey is required")
+        # (searchdate, data) -> (fetched_at, rates)
+        self._cache: Dict[Tuple[str, str], Tuple[float, List[ExchangeRate]]] = {}
+        # (rate_type, searchdate) -> (source rates list, projected dict)
+        self._rates_dict_cache: Dict[Tuple[str, Optional[str]], Tuple[List[ExchangeRate], Dict[str, float]]] = {}
+        # searchdate -> (source rates list, currency code -> rate)
+        self._by_code_cache: Dict[Optional[str], Tuple[List[ExchangeRate], Dict[str, ExchangeRate]]] = {}
     
-    def fetch_rates(
+    async def _get_content(self, params: Dict[str, str]) -> bytes:
+        """
+        GET the API with the given params and return the raw response body
+        Retries transient statuses with exponential backoff
+        """
+        client = _get_client()
+        for attempt in range(_MAX_RETRIES + 1):
+            response = await client.get(self.BASE_URL, params=params)
+            if response.status_code in _RETRY_STATUSES and attempt < _MAX_RETRIES:
+                await asyncio.sleep(_BACKOFF_FACTOR * (2 ** attempt))
+                continue
+            response.raise_for_status()
+            content = response.content
+            
+            # Log response status and content type for debugging
+            print(f"API Response Status: {response.status_code} ({response.http_version})")
+            print(f"API Response Content-Type: {response.headers.get('Content-Type', 'unknown')}")
+            print(f"API Response Length: {len(content)} bytes")
+            return content
+    
+    async def fetch_rates(
         self, 
         searchdate: Optional[str] = None,
         data: str = "AP01"
@@ -46,12 +135,17 @@ class KoreaEximExchangeRateClient:
             data: Request type (AP01: Exchange rates, AP02: Loan rates, AP03: International rates)
         
         Returns:
-            List of ExchangeRate objects
+            List of ExchangeRate objects (cached for a few minutes per searchdate/data)
         """
         if not searchdate:
             # Format today's date as YYYYMMDD
             searchdate = datetime.now().strftime("%Y%m%d")
         
+        cache_key = (searchdate, data)
+        cached = self._cache.get(cache_key)
+        if cached is not None and time.monotonic() - cached[0] < _CACHE_TTL_SECONDS:
+            return cached[1]
+        
         params = {
             "authkey": self.authkey,
             "searchdate": searchdate,
@@ -59,35 +153,18 @@ class KoreaEximExchangeRateClient:
         }
         
         try:
-            # Lambda environment may have SSL certificate issues
-            # Try with certifi first, fallback to system certificates
-            try:
-                response = requests.get(self.BASE_URL, params=params, timeout=10, verify=certifi.where())
-            except Exception:
-                # Fallback: use system default SSL verification
-                # If that fails, disable verification (not ideal but works in Lambda)
-                try:
-                    response = requests.get(self.BASE_URL, params=params, timeout=10, verify=True)
-                except Exception:
-                    print("Warning: SSL verification disabled due to certificate issues")
-                    response = requests.get(self.BASE_URL, params=params, timeout=10, verify=False)
-            response.raise_for_status()
-            
-            # Log response status and content type for debugging
-            print(f"API Response Status: {response.status_code}")
-            print(f"API Response Content-Type: {response.headers.get('Content-Type', 'unknown')}")
-            print(f"API Response Length: {len(response.content)} bytes")
+            content = await self._get_content(params)
             
             # Check if response is empty
-            if not response.content or len(response.content.strip()) == 0:
+            if not content or len(content.strip()) == 0:
                 raise ValueError("API returned empty response")
             
             # Try to parse JSON, but log raw response if it fails
             try:
-                data_list = response.json()
-            except ValueError as json_error:
+                data_list = orjson.loads(content)
+            except orjson.JSONDecodeError as json_error:
                 # Log first 500 chars of response for debugging
-                response_preview = response.text[:500] if response.text else "No text content"
+                response_preview = content[:500].decode("utf-8", errors="replace")
                 print(f"Failed to parse JSON. Response preview: {response_preview}")
                 raise ValueError(f"Invalid JSON response from API: {str(json_error)}")
             
@@ -96,39 +173,33 @@ class KoreaEximExchangeRateClient:
             if not isinstance(data_list, list):
                 raise ValueError(f"Unexpected API response format: {type(data_list)}")
             
-            rates = []
-            for item in data_list:
-                try:
-                    # Skip items with result != 1 (error or invalid entries)
-                    if item.get("result") != 1:
-                        continue
-                    
-                    # API returns lowercase field names: cur_unit, ttb, tts, deal_bas_r, cur_nm
-                    cur_unit = item.get("cur_unit", "").strip()
-                    if not cur_unit:
-                        continue
-                    
-                    rate = ExchangeRate(
-                        cur_unit=cur_unit,
-                        cur_nm=item.get("cur_nm", "").strip(),
-                        ttb=self._parse_rate(item.get("ttb", "")),
-                        tts=self._parse_rate(item.get("tts", "")),
-                        deal_bas_r=self._parse_rate(item.get("deal_bas_r", ""))
-                    )
-                    rates.append(rate)
-                except (ValueError, KeyError) as e:
-                    # Skip items that fail to parse
-                    print(f"Skipping invalid rate data: {item}, error: {e}")
-                    continue
+            # Keep result == 1 entries with a currency code; codes are
+            # uppercased here so lookups can compare them directly
+            parse_rate = self._parse_rate
+            rates = [
+                ExchangeRate(
+                    cur_unit=cur_unit,
+                    cur_nm=(item.get("cur_nm") or "").strip(),
+                    ttb=parse_rate(item.get("ttb", "")),
+                    tts=parse_rate(item.get("tts", "")),
+                    deal_bas_r=parse_rate(item.get("deal_bas_r", "")),
+                )
+                for item in data_list
+                if isinstance(item, dict)
+                and item.get("result") == 1
+                and (cur_unit := (item.get("cur_unit") or "").strip().upper())
+            ]
             
+            self._cache[cache_key] = (time.monotonic(), rates)
             return rates
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             raise Exception(f"Failed to fetch exchange rates: {str(e)}")
         except ValueError as e:
             raise Exception(f"Failed to parse exchange rates: {str(e)}")
     
-    def _parse_rate(self, rate_str: str) -> float:
+    @staticmethod
+    def _parse_rate(rate_str: str) -> float:
         """
         Convert exchange rate string to float
         Handle comma-separated number strings (e.g., "1,450.50" -> 1450.50)
@@ -136,14 +207,16 @@ class KoreaEximExchangeRateClient:
         if not rate_str:
             return 0.0
         
-        # Remove commas and convert to float
-        cleaned = str(rate_str).replace(",", "").strip()
+        s = rate_str if isinstance(rate_str, str) else str(rate_str)
+        # float() already ignores surrounding whitespace, so only commas need stripping
+        if "," in s:
+            s = s.translate(_COMMA_STRIP)
         try:
-            return float(cleaned)
+            return float(s)
         except ValueError:
             return 0.0
     
-    def get_rate_by_currency(
+    async def get_rate_by_currency(
         self, 
         currency_code: str,
         rate_type: str = "TTS",
@@ -160,24 +233,19 @@ class KoreaEximExchangeRateClient:
         Returns:
             Exchange rate value (None if not found)
         """
-        rates = self.fetch_rates(searchdate=searchdate)
+        getter = _rate_getter(rate_type)
+        rates = await self.fetch_rates(searchdate=searchdate)
         
-        # Search by currency code (case-insensitive)
-        currency_code_upper = currency_code.upper()
-        for rate in rates:
-            if rate.cur_unit.upper() == currency_code_upper:
-                if rate_type == "TTS":
-                    return rate.tts
-                elif rate_type == "TTB":
-                    return rate.ttb
-                elif rate_type == "DEAL_BAS_R":
-                    return rate.deal_bas_r
-                else:
-                    raise ValueError(f"Invalid rate_type: {rate_type}. Must be TTS, TTB, or DEAL_BAS_R")
+        cached = self._by_code_cache.get(searchdate)
+        if cached is None or cached[0] is not rates:
+            cached = (rates, {rate.cur_unit: rate for rate in rates})
+            self._by_code_cache[searchdate] = cached
         
-        return None
+        # Codes are stored uppercased, so the lookup is case-insensitive
+        rate = cached[1].get(currency_code.upper())
+        return getter(rate) if rate is not None else None
     
-    def get_all_rates_dict(
+    async def get_all_rates_dict(
         self,
         rate_type: str = "TTS",
         searchdate: Optional[str] = None
@@ -192,17 +260,16 @@ class KoreaEximExchangeRateClient:
         Returns:
             Dictionary mapping currency codes to rates
         """
-        rates = self.fetch_rates(searchdate=searchdate)
-        result = {}
+        getter = _rate_getter(rate_type)
+        rates = await self.fetch_rates(searchdate=searchdate)
+        
+        # The projection only changes when fetch_rates returns a new list
+        cached = self._rates_dict_cache.get((rate_type, searchdate))
+        if cached is not None and cached[0] is rates:
+            return cached[1]
         
-        for rate in rates:
-            currency_code = rate.cur_unit.upper()
-            if rate_type == "TTS":
-                result[currency_code] = rate.tts
-            elif rate_type == "TTB":
-                result[currency_code] = rate.ttb
-            elif rate_type == "DEAL_BAS_R":
-                result[currency_code] = rate.deal_bas_r
+        result = {rate.cur_unit: getter(rate) for rate in rates}
         
+        self._rates_dict_cache[(rate_type, searchdate)] = (rates, result)
         return result
 
@@ -2,6 +2,8 @@
 Application configuration
 """
 import os
+from datetime import timedelta
+from functools import cached_property
 from typing import List
 
 try:
@@ -25,6 +27,10 @@ class Settings(BaseSettings):
     ALERTS_TABLE_NAME: str
     USERS_TABLE_NAME: str
     AWS_REGION: str = os.environ.get("AWS_REGION", "us-east-1")
+    # Optional DAX cluster endpoint; when set, repositories read through DAX
+    # (needs amazon-dax-client and a VPC-attached function, neither of which
+    # the SAM template provides yet)
+    DAX_ENDPOINT: str = os.environ.get("DAX_ENDPOINT", "")
     
     # Telegram
     TELEGRAM_BOT_TOKEN: str = os.environ.get("TELEGRAM_BOT_TOKEN", "")
@@ -44,8 +50,14 @@ class Settings(BaseSettings):
     # Security
     SECRET_KEY: str = os.environ.get("SECRET_KEY", "change-this-secret-key-in-production")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.environ.get("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    BCRYPT_ROUNDS: int = int(os.environ.get("BCRYPT_ROUNDS", "12"))
     
-    model_config = ConfigDict(case_sensitive=True)
+    model_config = ConfigDict(case_sensitive=True, frozen=True)
+    
+    @cached_property
+    def ACCESS_TOKEN_EXPIRE_DELTA(self) -> timedelta:
+        """Access token lifetime, built once instead of per login"""
+        return timedelta(minutes=self.ACCESS_TOKEN_EXPIRE_MINUTES)
 
 
 settings = Settings()
@@ -3,7 +3,7 @@ FastAPI dependencies
 """
 from typing import Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 
 from app.db.repositories import (
@@ -29,10 +29,15 @@ def get_user_repository_dependency() -> UserRepository:
 
 
 async def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
     user_repository: UserRepository = Depends(get_user_repository_dependency),
 ) -> User:
-    """Dependency to get current authenticated user"""
+    """Dependency to get current authenticated user (resolved once per request)"""
+    cached_user = getattr(request.state, "current_user", None)
+    if cached_user is not None:
+        return cached_user
+    
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -57,4 +62,5 @@ async def get_current_user(
             detail="Inactive user"
         )
     
+    request.state.current_user = user
     return user
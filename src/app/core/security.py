@@ -1,46 +1,114 @@
 """
 Security utilities for authentication and password hashing
 """
+import asyncio
+import base64
+import hmac
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, UTC
+from functools import lru_cache
 from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+import bcrypt
+import orjson
+from cachetools import TTLCache
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # JWT settings
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
+# Encoded once; hmac.digest() then takes OpenSSL's one-shot HMAC path, which
+# uses the CPU's SHA extensions (SHA-NI / ARMv8 SHA-2) where available
+_SECRET_KEY_BYTES = SECRET_KEY.encode("utf-8")
+
+# Every token we issue shares this header, so its encoded segment is built once
+_JWT_HEADER_SEGMENT = base64.urlsafe_b64encode(orjson.dumps({"alg": ALGORITHM, "typ": "JWT"})).rstrip(b"=")
+
+# Password hashing settings
+BCRYPT_ROUNDS = settings.BCRYPT_ROUNDS
+
+# Recent verify_password results, so a burst of logins with the same
+# credentials pays the bcrypt cost once. Keys are HMACs, never raw passwords.
+_verify_cache: TTLCache = TTLCache(maxsize=1024, ttl=60)
+_verify_cache_lock = threading.Lock()
 
-def _prepare_password_for_bcrypt(password: str) -> str:
+# bcrypt releases the GIL while hashing, so one thread per vCPU runs hashes in
+# parallel. A dedicated pool keeps login bursts from starving the default
+# executor that the repositories use for DynamoDB calls.
+_bcrypt_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="bcrypt")
+
+
+def _prepare_password_for_bcrypt(password: str) -> bytes:
     """    
     Args:
         password: The password to prepare.
         
     Returns:
-        The prepared password (truncated to 72 bytes if necessary).
+        The UTF-8 encoded password (truncated to 72 bytes if necessary).
     """
     password_bytes = password.encode('utf-8')
     if len(password_bytes) > 72:
-        # Truncate to 72 bytes (bcrypt's limit)
-        # Decode back to string for passlib
-        return password_bytes[:72].decode('utf-8', errors='ignore')
-    return password
+        # Truncate to 72 bytes (bcrypt's limit), dropping any split trailing
+        # character exactly as the former passlib-based hashing did
+        return password_bytes[:72].decode('utf-8', errors='ignore').encode('utf-8')
+    return password_bytes
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
-    prepared_password = _prepare_password_for_bcrypt(plain_password)
-    return pwd_context.verify(prepared_password, hashed_password)
+    cache_key = hmac.digest(_SECRET_KEY_BYTES, f"{hashed_password}\x00{plain_password}".encode('utf-8'), "sha256")
+    with _verify_cache_lock:
+        cached = _verify_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    try:
+        result = bcrypt.checkpw(_prepare_password_for_bcrypt(plain_password), hashed_password.encode('utf-8'))
+    except ValueError:
+        # Malformed or non-bcrypt hash
+        result = False
+    
+    with _verify_cache_lock:
+        _verify_cache[cache_key] = result
+    return result
 
 
 def get_password_hash(password: str) -> str:
     """Hash a password"""
-    prepared_password = _prepare_password_for_bcrypt(password)
-    return pwd_context.hash(prepared_password)
+    salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    return bcrypt.hashpw(_prepare_password_for_bcrypt(password), salt).decode('utf-8')
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the bcrypt worker pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_pool, verify_password, plain_password, hashed_password)
+
+
+async def aget_password_hash(password: str) -> str:
+    """Hash a password on the bcrypt worker pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_pool, get_password_hash, password)
+
+
+def _b64url_encode(data: bytes) -> bytes:
+    """Unpadded base64url, as used by JWT segments"""
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64url_decode(segment: bytes) -> bytes:
+    """Decode an unpadded base64url JWT segment"""
+    return base64.urlsafe_b64decode(segment + b"=" * (-len(segment) % 4))
+
+
+def _sign(signing_input: bytes) -> bytes:
+    """HS256 signature over the "header.payload" signing input"""
+    return hmac.digest(_SECRET_KEY_BYTES, signing_input, "sha256")
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
@@ -48,17 +116,42 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     if expires_delta:
         expire = datetime.now(UTC) + expires_delta
     else:
-        expire = datetime.now(UTC) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
+        expire = datetime.now(UTC) + settings.ACCESS_TOKEN_EXPIRE_DELTA
+    to_encode.update({"exp": int(expire.timestamp())})
+    signing_input = _JWT_HEADER_SEGMENT + b"." + _b64url_encode(orjson.dumps(to_encode))
+    return (signing_input + b"." + _b64url_encode(_sign(signing_input))).decode("ascii")
 
 
-def decode_access_token(token: str) -> Optional[dict]:
-    """Decode and verify a JWT token"""
+@lru_cache(maxsize=1024)
+def _decode_access_token_cached(token: str) -> Optional[dict]:
+    """Verify a JWT once per distinct token"""
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except JWTError:
+        header_segment, payload_segment, signature_segment = token.encode("ascii").split(b".")
+        header = orjson.loads(_b64url_decode(header_segment))
+        if not isinstance(header, dict) or header.get("alg") != ALGORITHM:
+            return None
+        signature = _b64url_decode(signature_segment)
+        if not hmac.compare_digest(signature, _sign(header_segment + b"." + payload_segment)):
+            return None
+        payload = orjson.loads(_b64url_decode(payload_segment))
+    except ValueError:
+        # Wrong segment count, bad base64/JSON or non-ASCII token
+        return None
+    if not isinstance(payload, dict):
         return None
+    exp = payload.get("exp")
+    if exp is not None and (isinstance(exp, bool) or not isinstance(exp, (int, float))):
+        return None
+    return payload
+
 
+def decode_access_token(token: str) -> Optional[dict]:
+    """Decode and verify a JWT token"""
+    payload = _decode_access_token_cached(token)
+    if payload is None:
+        return None
+    # Checked on every call: a cached payload may have expired since it was verified
+    exp = payload.get("exp")
+    if exp is not None and exp <= time.time():
+        return None
+    return dict(payload)
@@ -0,0 +1,28 @@
+"""
+Shared DynamoDB connection settings
+"""
+import boto3
+from botocore.config import Config
+
+# Keep-alive pooled connections with bounded timeouts; adaptive retries
+# back off client-side when DynamoDB starts throttling
+DYNAMODB_CONFIG = Config(
+    max_pool_connections=50,
+    tcp_keepalive=True,
+    connect_timeout=5,
+    read_timeout=10,
+    retries={"max_attempts": 3, "mode": "adaptive"},
+)
+
+
+def get_dynamodb_resource():
+    """Return a DynamoDB resource using the shared connection settings"""
+    return boto3.resource("dynamodb", config=DYNAMODB_CONFIG)
+
+
+def get_dax_resource(endpoint_url: str):
+    """Return a DynamoDB-compatible resource that reads and writes through DAX"""
+    # Optional dependency, only needed when a DAX endpoint is configured
+    from amazondax import AmazonDaxClient
+
+    return AmazonDaxClient.resource(endpoint_url=endpoint_url)
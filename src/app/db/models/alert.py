@@ -1,13 +1,37 @@
 """
 Alert data models (database-agnostic)
 """
+import operator
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional
 from dataclasses import dataclass
 from decimal import Decimal
 
+from app.db.models.datetimes import parse_datetime
 
-@dataclass
+# Scalar fields copied as-is by to_dict/to_response_dict (target_rate and
+# the timestamps need per-target conversion)
+_ALERT_FIELDS = (
+    "alert_id",
+    "user_id",
+    "telegram_chat_id",
+    "base_currency",
+    "target_currency",
+    "condition",
+    "rate_type",
+    "is_active",
+)
+_get_alert_fields = operator.attrgetter(*_ALERT_FIELDS)
+
+
+@lru_cache(maxsize=4096)
+def float_to_decimal(value: float) -> Decimal:
+    """Convert a float to the Decimal DynamoDB stores (memoised: rates repeat a lot)"""
+    return Decimal(str(value))
+
+
+@dataclass(slots=True)
 class Alert:
     """Alert domain model"""
     alert_id: str
@@ -24,51 +48,41 @@ class Alert:
     
     def to_dict(self) -> dict:
         """Convert to dictionary, converting float to Decimal for DynamoDB."""
-        result = {
-            "alert_id": self.alert_id,
-            "user_id": self.user_id,
-            "telegram_chat_id": self.telegram_chat_id,
-            "base_currency": self.base_currency,
-            "target_currency": self.target_currency,
-            "target_rate": Decimal(str(self.target_rate)),
-            "condition": self.condition,
-            "rate_type": self.rate_type,
-            "is_active": self.is_active,
-        }
+        result = dict(zip(_ALERT_FIELDS, _get_alert_fields(self)))
+        result["target_rate"] = float_to_decimal(self.target_rate)
         if self.created_at:
             result["created_at"] = self.created_at.isoformat()
         if self.updated_at:
             result["updated_at"] = self.updated_at.isoformat()
         return result
     
+    def to_response_dict(self) -> dict:
+        """Convert to dictionary with API-ready types (float rate, datetime objects)."""
+        result = dict(zip(_ALERT_FIELDS, _get_alert_fields(self)))
+        result["target_rate"] = float(self.target_rate)
+        result["created_at"] = self.created_at
+        result["updated_at"] = self.updated_at
+        return result
+    
     @classmethod
     def from_dict(cls, data: dict) -> "Alert":
         """Create from dictionary"""
-        # Handle datetime strings
-        created_at = None
-        updated_at = None
-        if "created_at" in data:
-            if isinstance(data["created_at"], str):
-                created_at = datetime.fromisoformat(data["created_at"].replace("Z", "+00:00"))
-            elif isinstance(data["created_at"], datetime):
-                created_at = data["created_at"]
-        if "updated_at" in data:
-            if isinstance(data["updated_at"], str):
-                updated_at = datetime.fromisoformat(data["updated_at"].replace("Z", "+00:00"))
-            elif isinstance(data["updated_at"], datetime):
-                updated_at = data["updated_at"]
-        
-        return cls(
-            alert_id=data["alert_id"],
-            user_id=data["user_id"],
-            telegram_chat_id=data["telegram_chat_id"],
-            base_currency=data["base_currency"],
-            target_currency=data["target_currency"],
-            target_rate=float(data["target_rate"]),
-            condition=data["condition"],
-            rate_type=data.get("rate_type", "TTS"),  # Default: TTS
-            is_active=bool(data.get("is_active", True)),
-            created_at=created_at,
-            updated_at=updated_at,
-        )
+        return row_to_alert(data)
+
 
+def row_to_alert(data: dict, _parse_datetime=parse_datetime, _Alert=Alert) -> Alert:
+    """Build an Alert from a DynamoDB item (hot path: positional args, bound globals)"""
+    get = data.get
+    return _Alert(
+        data["alert_id"],
+        data["user_id"],
+        data["telegram_chat_id"],
+        data["base_currency"],
+        data["target_currency"],
+        float(data["target_rate"]),
+        data["condition"],
+        get("rate_type", "TTS"),  # Default: TTS
+        bool(get("is_active", True)),
+        _parse_datetime(get("created_at")),
+        _parse_datetime(get("updated_at")),
+    )
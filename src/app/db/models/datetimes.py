@@ -0,0 +1,14 @@
+"""
+Datetime helpers shared by the domain models
+"""
+from datetime import datetime
+from typing import Optional, Union
+
+
+def parse_datetime(value: Union[str, datetime, None]) -> Optional[datetime]:
+    """Parse a stored ISO-8601 timestamp ("Z" suffix allowed); datetimes pass through"""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str) and value:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return None
@@ -5,8 +5,10 @@ from datetime import datetime
 from typing import Optional
 from dataclasses import dataclass
 
+from app.db.models.datetimes import parse_datetime
 
-@dataclass
+
+@dataclass(slots=True)
 class User:
     """User domain model"""
     user_id: str
@@ -36,26 +38,18 @@ class User:
     @classmethod
     def from_dict(cls, data: dict) -> "User":
         """Create from dictionary"""
-        created_at = None
-        updated_at = None
-        if "created_at" in data:
-            if isinstance(data["created_at"], str):
-                created_at = datetime.fromisoformat(data["created_at"].replace("Z", "+00:00"))
-            elif isinstance(data["created_at"], datetime):
-                created_at = data["created_at"]
-        if "updated_at" in data:
-            if isinstance(data["updated_at"], str):
-                updated_at = datetime.fromisoformat(data["updated_at"].replace("Z", "+00:00"))
-            elif isinstance(data["updated_at"], datetime):
-                updated_at = data["updated_at"]
-        
-        return cls(
-            user_id=data["user_id"],
-            email=data["email"],
-            telegram_chat_id=data["telegram_chat_id"],
-            hashed_password=data.get("hashed_password", ""),
-            is_active=bool(data.get("is_active", True)),
-            created_at=created_at,
-            updated_at=updated_at,
-        )
+        return row_to_user(data)
+
 
+def row_to_user(data: dict, _parse_datetime=parse_datetime, _User=User) -> User:
+    """Build a User from a DynamoDB item (positional args, bound globals)"""
+    get = data.get
+    return _User(
+        data["user_id"],
+        data["email"],
+        data["telegram_chat_id"],
+        get("hashed_password", ""),
+        bool(get("is_active", True)),
+        _parse_datetime(get("created_at")),
+        _parse_datetime(get("updated_at")),
+    )
@@ -3,19 +3,24 @@ Repository factories
 """
 from functools import lru_cache
 
-from app.db.repositories.alert_repository import AlertRepository, DynamoDBAlertRepository
-from app.db.repositories.user_repository import UserRepository, DynamoDBUserRepository
+from app.core.config import settings
+from app.db.repositories.alert_repository import AlertRepository, DaxAlertRepository, DynamoDBAlertRepository
+from app.db.repositories.user_repository import UserRepository, DaxUserRepository, DynamoDBUserRepository
 
 
 @lru_cache
 def get_alert_repository() -> AlertRepository:
     """Return singleton alert repository"""
+    if settings.DAX_ENDPOINT:
+        return DaxAlertRepository()
     return DynamoDBAlertRepository()
 
 
 @lru_cache
 def get_user_repository() -> UserRepository:
     """Return singleton user repository"""
+    if settings.DAX_ENDPOINT:
+        return DaxUserRepository()
     return DynamoDBUserRepository()
 
 
@@ -3,95 +3,239 @@ Alert repository backed by DynamoDB
 """
 from __future__ import annotations
 
+import asyncio
+from abc import ABC, abstractmethod
+from contextlib import aclosing
 from datetime import datetime, UTC
-from decimal import Decimal
-from typing import List, Optional, Protocol, runtime_checkable
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
 
-import boto3
 from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
 
 from app.core.config import settings
-from app.db.models.alert import Alert
+from app.db.dynamodb import get_dax_resource, get_dynamodb_resource
+from app.db.models.alert import Alert, float_to_decimal, row_to_alert
 
+# BatchGetItem accepts at most 100 keys per call
+_BATCH_GET_LIMIT = 100
+_BATCH_GET_MAX_RETRIES = 5
+_BATCH_GET_BACKOFF = 0.05
 
-@runtime_checkable
-class AlertRepository(Protocol):
+# A filter expression's IN operator takes at most 100 operands
+_FILTER_IN_LIMIT = 100
+
+# Only the attributes row_to_alert reads ("condition" is a reserved word)
+_ALERT_PROJECTION_EXPRESSION = (
+    "alert_id, user_id, telegram_chat_id, base_currency, target_currency, "
+    "target_rate, #c, rate_type, is_active, created_at, updated_at"
+)
+
+
+def _alert_projection() -> Dict[str, Any]:
+    """Projection kwargs for alert reads.
+
+    Built per call: boto3 merges generated condition placeholders into
+    ExpressionAttributeNames in place, so the dict must not be shared.
+    """
+    return {
+        "ProjectionExpression": _ALERT_PROJECTION_EXPRESSION,
+        "ExpressionAttributeNames": {"#c": "condition"},
+    }
+
+
+def _is_condition_failure(error: ClientError) -> bool:
+    """True when a conditional write was rejected (alert missing or not owned)"""
+    return error.response.get("Error", {}).get("Code") == "ConditionalCheckFailedException"
+
+
+class AlertRepository(ABC):
     """Alert repository contract"""
 
+    @abstractmethod
     async def create_alert(self, alert: Alert) -> Alert:
         ...
 
+    @abstractmethod
     async def get_alert(self, alert_id: str) -> Optional[Alert]:
         ...
 
+    @abstractmethod
+    async def get_alerts(self, alert_ids: List[str]) -> List[Alert]:
+        ...
+
+    @abstractmethod
     async def list_alerts(
         self,
-        user_id: Optional[str] = None,
+        user_id: str,
         is_active: Optional[bool] = None,
     ) -> List[Alert]:
         ...
 
-    async def update_alert(self, alert_id: str, **kwargs) -> Optional[Alert]:
+    @abstractmethod
+    def iter_alerts(self, is_active: Optional[bool] = None) -> AsyncIterator[Alert]:
+        ...
+
+    @abstractmethod
+    async def has_active_alerts(self) -> bool:
+        ...
+
+    @abstractmethod
+    async def list_alerts_by_user(
+        self,
+        user_id: str,
+        is_active: Optional[bool] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Alert], Optional[str]]:
         ...
 
-    async def delete_alert(self, alert_id: str) -> bool:
+    @abstractmethod
+    async def update_alert(self, alert_id: str, *, owner_id: Optional[str] = None, **kwargs) -> Optional[Alert]:
         ...
 
+    @abstractmethod
+    async def delete_alert(self, alert_id: str, *, owner_id: Optional[str] = None) -> bool:
+        ...
+
+    @abstractmethod
     async def get_active_alerts_by_base_currency(self, base_currency: str) -> List[Alert]:
         ...
 
+    @abstractmethod
+    async def get_active_alerts_for_currencies(
+        self,
+        base_currency: str,
+        target_currencies: Iterable[str],
+    ) -> List[Alert]:
+        ...
+
 
 class DynamoDBAlertRepository(AlertRepository):
     """Concrete DynamoDB implementation for alerts"""
 
-    def __init__(self, table_name: Optional[str] = None):
-        resource = boto3.resource("dynamodb")
-        self.table = resource.Table(table_name or settings.ALERTS_TABLE_NAME)
+    def __init__(self, table_name: Optional[str] = None, resource=None):
+        self.resource = resource or get_dynamodb_resource()
+        self.table = self.resource.Table(table_name or settings.ALERTS_TABLE_NAME)
 
     async def create_alert(self, alert: Alert) -> Alert:
         item = alert.to_dict()
-        item["created_at"] = datetime.now(UTC).isoformat()
-        item["updated_at"] = datetime.now(UTC).isoformat()
-        self.table.put_item(Item=item)
+        now_iso = datetime.now(UTC).isoformat()
+        item["created_at"] = now_iso
+        item["updated_at"] = now_iso
+        await asyncio.to_thread(self.table.put_item, Item=item)
         return alert
 
     async def get_alert(self, alert_id: str) -> Optional[Alert]:
-        response = self.table.get_item(Key={"alert_id": alert_id})
+        response = await asyncio.to_thread(self.table.get_item, Key={"alert_id": alert_id})
         item = response.get("Item")
-        return Alert.from_dict(item) if item else None
+        return row_to_alert(item) if item else None
+
+    async def get_alerts(self, alert_ids: List[str]) -> List[Alert]:
+        """Fetch many alerts with BatchGetItem, in the order of alert_ids (missing ids are skipped)"""
+        unique_ids = list(dict.fromkeys(alert_ids))  # BatchGetItem rejects duplicate keys
+        found: Dict[str, Alert] = {}
+        for start in range(0, len(unique_ids), _BATCH_GET_LIMIT):
+            request_items = {
+                self.table.name: {
+                    "Keys": [{"alert_id": alert_id} for alert_id in unique_ids[start:start + _BATCH_GET_LIMIT]],
+                    **_alert_projection(),
+                }
+            }
+            for attempt in range(_BATCH_GET_MAX_RETRIES + 1):
+                response = await asyncio.to_thread(self.resource.batch_get_item, RequestItems=request_items)
+                for item in response.get("Responses", {}).get(self.table.name, []):
+                    found[item["alert_id"]] = row_to_alert(item)
+                request_items = response.get("UnprocessedKeys")
+                if not request_items:
+                    break
+                if attempt == _BATCH_GET_MAX_RETRIES:
+                    raise RuntimeError(f"BatchGetItem left {len(request_items[self.table.name]['Keys'])} keys unprocessed")
+                # Throttled keys come back unprocessed; back off before retrying them
+                await asyncio.sleep(_BATCH_GET_BACKOFF * (2 ** attempt))
+        return [found[alert_id] for alert_id in unique_ids if alert_id in found]
+
+    async def _paginate(self, operation: str, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every item of a query/scan, following LastEvaluatedKey page by page"""
+        method = getattr(self.table, operation)
+        while True:
+            response = await asyncio.to_thread(method, **kwargs)
+            for item in response.get("Items", []):
+                yield item
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key:
+                return
+            kwargs["ExclusiveStartKey"] = last_key
 
     async def list_alerts(
         self,
-        user_id: Optional[str] = None,
+        user_id: str,
         is_active: Optional[bool] = None,
     ) -> List[Alert]:
-        if user_id:
-            try:
-                key_condition = Key("user_id").eq(user_id)
-                if is_active is not None:
-                    response = self.table.query(
-                        IndexName="user_id-index",
-                        KeyConditionExpression=key_condition,
-                        FilterExpression=Attr("is_active").eq(is_active),
-                    )
-                else:
-                    response = self.table.query(
-                        IndexName="user_id-index",
-                        KeyConditionExpression=key_condition,
-                    )
-                return [Alert.from_dict(item) for item in response.get("Items", [])]
-            except Exception:
-                # GSI not ready – fall back to scan below
-                pass
-
-        filter_expression = Attr("is_active").eq(is_active) if is_active is not None else None
-        if filter_expression:
-            response = self.table.scan(FilterExpression=filter_expression)
-        else:
-            response = self.table.scan()
-        return [Alert.from_dict(item) for item in response.get("Items", [])]
-
-    async def update_alert(self, alert_id: str, **kwargs) -> Optional[Alert]:
+        alerts, _ = await self.list_alerts_by_user(user_id, is_active=is_active)
+        return alerts
+
+    async def iter_alerts(self, is_active: Optional[bool] = None) -> AsyncIterator[Alert]:
+        """Yield every alert across all users, one scan page at a time.
+
+        No key to query on, so this is inherently a table scan; it is a
+        generator so callers never hold the whole table in memory.
+        """
+        scan_kwargs = _alert_projection()
+        if is_active is not None:
+            scan_kwargs["FilterExpression"] = Attr("is_active").eq(is_active)
+        async for item in self._paginate("scan", **scan_kwargs):
+            yield row_to_alert(item)
+
+    async def has_active_alerts(self) -> bool:
+        """True if any alert is active; the scan stops at the first page with a match"""
+        items = self._paginate(
+            "scan",
+            ProjectionExpression="alert_id",
+            FilterExpression=Attr("is_active").eq(True),
+        )
+        async with aclosing(items):
+            async for _ in items:
+                return True
+        return False
+
+    async def list_alerts_by_user(
+        self,
+        user_id: str,
+        is_active: Optional[bool] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Alert], Optional[str]]:
+        """Query one user's alerts through the user_id GSI, one page at a time.
+
+        Returns the alerts and a cursor (the last evaluated alert_id) to pass
+        back in for the next page, or None once the index is exhausted.
+        """
+        query_kwargs = {
+            "IndexName": "user_id-index",
+            "KeyConditionExpression": Key("user_id").eq(user_id),
+            **_alert_projection(),
+        }
+        if is_active is not None:
+            query_kwargs["FilterExpression"] = Attr("is_active").eq(is_active)
+        if cursor:
+            query_kwargs["ExclusiveStartKey"] = {"alert_id": cursor, "user_id": user_id}
+
+        alerts: List[Alert] = []
+        while True:
+            if limit is not None:
+                # Limit counts evaluated items, so keep paging until the filter fills the page
+                query_kwargs["Limit"] = limit - len(alerts)
+            response = await asyncio.to_thread(self.table.query, **query_kwargs)
+            alerts.extend(row_to_alert(item) for item in response.get("Items", []))
+            last_key = response.get("LastEvaluatedKey")
+            if not last_key or (limit is not None and len(alerts) >= limit):
+                break
+            query_kwargs["ExclusiveStartKey"] = last_key
+
+        return alerts, last_key["alert_id"] if last_key else None
+
+    async def update_alert(self, alert_id: str, *, owner_id: Optional[str] = None, **kwargs) -> Optional[Alert]:
+        """Update an alert; with owner_id the write only applies if the alert belongs to that user"""
         update_expression_parts = []
         expression_attribute_values = {}
         expression_attribute_names = {}
@@ -102,51 +246,97 @@ class DynamoDBAlertRepository(AlertRepository):
                 expression_attribute_names[f"#{key}"] = key
                 # Convert float to Decimal for DynamoDB compatibility
                 if isinstance(value, float):
-                    expression_attribute_values[f":{key}"] = Decimal(str(value))
+                    expression_attribute_values[f":{key}"] = float_to_decimal(value)
                 else:
                     expression_attribute_values[f":{key}"] = value
 
         if not update_expression_parts:
-            return await self.get_alert(alert_id)
+            # Nothing to write, so don't bump updated_at; ownership is checked on the read
+            alert = await self.get_alert(alert_id)
+            if alert is None or (owner_id is not None and alert.user_id != owner_id):
+                return None
+            return alert
 
         update_expression_parts.append("#updated_at = :updated_at")
         expression_attribute_names["#updated_at"] = "updated_at"
         expression_attribute_values[":updated_at"] = datetime.now(UTC).isoformat()
 
         update_expression = "SET " + ", ".join(update_expression_parts)
+        update_kwargs = {}
+        if owner_id is not None:
+            # Fails with ConditionalCheckFailedException if the alert is missing or not owned
+            update_kwargs["ConditionExpression"] = Attr("user_id").eq(owner_id)
         try:
-            self.table.update_item(
+            response = await asyncio.to_thread(
+                self.table.update_item,
                 Key={"alert_id": alert_id},
                 UpdateExpression=update_expression,
                 ExpressionAttributeNames=expression_attribute_names,
                 ExpressionAttributeValues=expression_attribute_values,
                 ReturnValues="ALL_NEW",
+                **update_kwargs,
             )
-            return await self.get_alert(alert_id)
-        except Exception:
+            return row_to_alert(response["Attributes"])
+        except ClientError as e:
+            if not _is_condition_failure(e):
+                raise
             return None
 
-    async def delete_alert(self, alert_id: str) -> bool:
+    async def delete_alert(self, alert_id: str, *, owner_id: Optional[str] = None) -> bool:
+        """Delete an alert; with owner_id the delete only applies if the alert belongs to that user"""
+        delete_kwargs = {}
+        if owner_id is not None:
+            delete_kwargs["ConditionExpression"] = Attr("user_id").eq(owner_id)
         try:
-            self.table.delete_item(Key={"alert_id": alert_id})
+            await asyncio.to_thread(self.table.delete_item, Key={"alert_id": alert_id}, **delete_kwargs)
             return True
-        except Exception:
+        except ClientError as e:
+            if not _is_condition_failure(e):
+                raise
             return False
 
     async def get_active_alerts_by_base_currency(self, base_currency: str) -> List[Alert]:
-        try:
-            response = self.table.query(
+        items = self._paginate(
+            "query",
+            IndexName="base_currency-index",
+            KeyConditionExpression=Key("base_currency").eq(base_currency),
+            FilterExpression=Attr("is_active").eq(True),
+            **_alert_projection(),
+        )
+        return [row_to_alert(item) async for item in items]
+
+    async def get_active_alerts_for_currencies(
+        self,
+        base_currency: str,
+        target_currencies: Iterable[str],
+    ) -> List[Alert]:
+        """Active alerts for base_currency whose target currency is one of target_currencies.
+
+        The target filter runs server-side, so alerts on currencies missing
+        from target_currencies are never sent back to the caller.
+        """
+        targets = list(dict.fromkeys(target_currencies))
+        alerts: List[Alert] = []
+        for start in range(0, len(targets), _FILTER_IN_LIMIT):
+            items = self._paginate(
+                "query",
                 IndexName="base_currency-index",
                 KeyConditionExpression=Key("base_currency").eq(base_currency),
-                FilterExpression=Attr("is_active").eq(True),
-            )
-            return [Alert.from_dict(item) for item in response.get("Items", [])]
-        except Exception:
-            response = self.table.scan(
-                FilterExpression=Attr("base_currency").eq(base_currency) & Attr("is_active").eq(True)
+                FilterExpression=(
+                    Attr("is_active").eq(True)
+                    & Attr("target_currency").is_in(targets[start:start + _FILTER_IN_LIMIT])
+                ),
+                **_alert_projection(),
             )
-            return [Alert.from_dict(item) for item in response.get("Items", [])]
+            alerts.extend([row_to_alert(item) async for item in items])
+        return alerts
+
+
+class DaxAlertRepository(DynamoDBAlertRepository):
+    """DynamoDB alerts repository that reads and writes through a DAX cluster"""
 
+    def __init__(self, endpoint_url: Optional[str] = None, table_name: Optional[str] = None):
+        super().__init__(table_name, resource=get_dax_resource(endpoint_url or settings.DAX_ENDPOINT))
 
-__all__ = ["AlertRepository", "DynamoDBAlertRepository"]
 
+__all__ = ["AlertRepository", "DynamoDBAlertRepository", "DaxAlertRepository"]
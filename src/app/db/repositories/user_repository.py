@@ -3,29 +3,34 @@ User repository backed by DynamoDB
 """
 from __future__ import annotations
 
+import asyncio
+from abc import ABC, abstractmethod
 from datetime import datetime, UTC
-from typing import Optional, Protocol, runtime_checkable
+from typing import Optional
 
-import boto3
 from boto3.dynamodb.conditions import Attr, Key
 
 from app.core.config import settings
-from app.db.models.user import User
+from app.db.dynamodb import get_dax_resource, get_dynamodb_resource
+from app.db.models.user import User, row_to_user
 
 
-@runtime_checkable
-class UserRepository(Protocol):
+class UserRepository(ABC):
     """User repository contract"""
 
+    @abstractmethod
     async def create_user(self, user: User) -> User:
         ...
 
+    @abstractmethod
     async def get_user_by_id(self, user_id: str) -> Optional[User]:
         ...
 
+    @abstractmethod
     async def get_user_by_email(self, email: str) -> Optional[User]:
         ...
 
+    @abstractmethod
     async def update_user(self, user_id: str, **kwargs) -> Optional[User]:
         ...
 
@@ -33,38 +38,40 @@ class UserRepository(Protocol):
 class DynamoDBUserRepository(UserRepository):
     """Concrete DynamoDB implementation for users"""
 
-    def __init__(self, table_name: Optional[str] = None):
-        resource = boto3.resource("dynamodb")
-        self.table = resource.Table(table_name or settings.USERS_TABLE_NAME)
+    def __init__(self, table_name: Optional[str] = None, resource=None):
+        self.resource = resource or get_dynamodb_resource()
+        self.table = self.resource.Table(table_name or settings.USERS_TABLE_NAME)
 
     async def create_user(self, user: User) -> User:
         item = user.to_dict(exclude_password=False)
-        item["created_at"] = datetime.now(UTC).isoformat()
-        item["updated_at"] = datetime.now(UTC).isoformat()
-        self.table.put_item(Item=item)
+        now_iso = datetime.now(UTC).isoformat()
+        item["created_at"] = now_iso
+        item["updated_at"] = now_iso
+        await asyncio.to_thread(self.table.put_item, Item=item)
         return user
 
     async def get_user_by_id(self, user_id: str) -> Optional[User]:
-        response = self.table.get_item(Key={"user_id": user_id})
+        response = await asyncio.to_thread(self.table.get_item, Key={"user_id": user_id})
         item = response.get("Item")
-        return User.from_dict(item) if item else None
+        return row_to_user(item) if item else None
 
     async def get_user_by_email(self, email: str) -> Optional[User]:
         try:
-            response = self.table.query(
+            response = await asyncio.to_thread(
+                self.table.query,
                 IndexName="email-index",
                 KeyConditionExpression=Key("email").eq(email),
             )
             items = response.get("Items", [])
             if not items:
                 return None
-            return User.from_dict(items[0])
+            return row_to_user(items[0])
         except Exception:
-            response = self.table.scan(FilterExpression=Attr("email").eq(email))
+            response = await asyncio.to_thread(self.table.scan, FilterExpression=Attr("email").eq(email))
             items = response.get("Items", [])
             if not items:
                 return None
-            return User.from_dict(items[0])
+            return row_to_user(items[0])
 
     async def update_user(self, user_id: str, **kwargs) -> Optional[User]:
         update_expression_parts = []
@@ -87,16 +94,24 @@ class DynamoDBUserRepository(UserRepository):
         update_expression = "SET " + ", ".join(update_expression_parts)
 
         try:
-            self.table.update_item(
+            response = await asyncio.to_thread(
+                self.table.update_item,
                 Key={"user_id": user_id},
                 UpdateExpression=update_expression,
                 ExpressionAttributeNames=expression_attribute_names,
                 ExpressionAttributeValues=expression_attribute_values,
+                ReturnValues="ALL_NEW",
             )
-            return await self.get_user_by_id(user_id)
+            return row_to_user(response["Attributes"])
         except Exception:
             return None
 
 
-__all__ = ["UserRepository", "DynamoDBUserRepository"]
+class DaxUserRepository(DynamoDBUserRepository):
+    """DynamoDB users repository that reads and writes through a DAX cluster"""
+
+    def __init__(self, endpoint_url: Optional[str] = None, table_name: Optional[str] = None):
+        super().__init__(table_name, resource=get_dax_resource(endpoint_url or settings.DAX_ENDPOINT))
+
 
+__all__ = ["UserRepository", "DynamoDBUserRepository", "DaxUserRepository"]
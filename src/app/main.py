@@ -1,12 +1,16 @@
 """
 Main FastAPI application entry point
 """
+import os
+
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from mangum import Mangum
 
 from app.api.v1 import alerts, auth
 from app.core.config import settings
+from app.db.repositories import get_alert_repository, get_user_repository
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -14,15 +18,16 @@ app = FastAPI(
     description="Currency tracking and alert system with Telegram notifications",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
 )
 
-# CORS middleware
+# CORS middleware (explicit methods/headers: exactly what the API serves)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.ALLOWED_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_headers=["authorization", "content-type"],
 )
 
 # Include routers
@@ -46,6 +51,24 @@ async def health_check():
     return {"status": "healthy"}
 
 
-# Lambda handler
-handler = Mangum(app)
+def _warm_dynamodb() -> None:
+    """Open the DynamoDB connections during Lambda INIT instead of on the first request"""
+    if settings.DAX_ENDPOINT:
+        # DAX doesn't serve control-plane calls like describe_table
+        return
+    for get_repository in (get_alert_repository, get_user_repository):
+        try:
+            repository = get_repository()
+            repository.table.meta.client.describe_table(TableName=repository.table.name)
+        except Exception as e:
+            # Never fail a cold start over the warm-up; the first request will retry
+            print(f"DynamoDB warm-up failed in {get_repository.__name__}: {str(e)}")
+
+
+# Only inside Lambda, so imports in tests and local tools stay offline
+if os.environ.get("AWS_LAMBDA_FUNCTION_NAME"):
+    _warm_dynamodb()
+
+# Lambda handler (no startup/shutdown events to run, so skip the lifespan cycle)
+handler = Mangum(app, lifespan="off")
 
@@ -2,13 +2,21 @@
 Alert service layer - business logic
 """
 import uuid
-from typing import List, Optional
+from typing import List, NoReturn, Optional, Tuple
 
 from app.db.repositories import AlertRepository
 from app.db.models.alert import Alert
 from app.schemas.alert import AlertCreate, AlertUpdate
 
 
+class AlertNotFoundError(Exception):
+    """Raised when an alert does not exist"""
+
+
+class AlertAccessDeniedError(Exception):
+    """Raised when an alert belongs to a different user"""
+
+
 class AlertService:
     """Alert business logic service"""
 
@@ -37,23 +45,50 @@ class AlertService:
         """Get an alert by ID"""
         return await self.repository.get_alert(alert_id)
     
-    async def list_alerts(self, user_id: Optional[str] = None, is_active: Optional[bool] = None) -> List[Alert]:
-        """List alerts with optional filters"""
+    async def list_alerts(self, user_id: str, is_active: Optional[bool] = None) -> List[Alert]:
+        """List a user's alerts, optionally filtered by active status"""
         return await self.repository.list_alerts(user_id=user_id, is_active=is_active)
     
-    async def update_alert(self, alert_id: str, update_data: AlertUpdate) -> Optional[Alert]:
-        """Update an alert"""
+    async def list_user_alerts(
+        self,
+        user_id: str,
+        is_active: Optional[bool] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Alert], Optional[str]]:
+        """List one page of a user's alerts and the cursor for the next page"""
+        return await self.repository.list_alerts_by_user(
+            user_id, is_active=is_active, limit=limit, cursor=cursor
+        )
+    
+    async def update_alert(self, alert_id: str, user_id: str, update_data: AlertUpdate) -> Alert:
+        """Update an alert owned by user_id"""
         update_dict = update_data.model_dump(exclude_unset=True)
-        return await self.repository.update_alert(alert_id, **update_dict)
+        alert = await self.repository.update_alert(alert_id, owner_id=user_id, **update_dict)
+        if alert is None:
+            await self._raise_write_rejected(alert_id, user_id)
+        return alert
     
-    async def delete_alert(self, alert_id: str) -> bool:
-        """Delete an alert"""
-        return await self.repository.delete_alert(alert_id)
+    async def delete_alert(self, alert_id: str, user_id: str) -> None:
+        """Delete an alert owned by user_id"""
+        if not await self.repository.delete_alert(alert_id, owner_id=user_id):
+            await self._raise_write_rejected(alert_id, user_id)
     
-    async def toggle_alert(self, alert_id: str) -> Optional[Alert]:
-        """Toggle alert active status"""
+    async def toggle_alert(self, alert_id: str, user_id: str) -> Alert:
+        """Toggle active status of an alert owned by user_id"""
         alert = await self.repository.get_alert(alert_id)
         if not alert:
-            return None
-        return await self.repository.update_alert(alert_id, is_active=not alert.is_active)
-
+            raise AlertNotFoundError(alert_id)
+        if alert.user_id != user_id:
+            raise AlertAccessDeniedError(alert_id)
+        alert = await self.repository.update_alert(alert_id, owner_id=user_id, is_active=not alert.is_active)
+        if alert is None:
+            await self._raise_write_rejected(alert_id, user_id)
+        return alert
+    
+    async def _raise_write_rejected(self, alert_id: str, user_id: str) -> NoReturn:
+        """Work out why a conditional write was rejected (only runs on the failure path)"""
+        alert = await self.repository.get_alert(alert_id)
+        if alert is not None and alert.user_id != user_id:
+            raise AlertAccessDeniedError(alert_id)
+        raise AlertNotFoundError(alert_id)
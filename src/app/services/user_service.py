@@ -5,7 +5,7 @@ import uuid
 from typing import Optional
 
 from app.db.repositories import UserRepository
-from app.core.security import verify_password, get_password_hash
+from app.core.security import averify_password, aget_password_hash
 from app.db.models.user import User
 from app.schemas.user import UserCreate
 
@@ -23,12 +23,15 @@ class UserService:
         if existing_user:
             raise ValueError("User with this email already exists")
         
+        # bcrypt is CPU-bound; hash on the bcrypt pool, off the event loop
+        hashed_password = await aget_password_hash(user_data.password)
+        
         # Create user
         user = User(
             user_id=str(uuid.uuid4()),
             email=user_data.email,
             telegram_chat_id=user_data.telegram_chat_id,
-            hashed_password=get_password_hash(user_data.password),
+            hashed_password=hashed_password,
             is_active=True,
         )
         return await self.user_repository.create_user(user)
@@ -38,7 +41,7 @@ class UserService:
         user = await self.user_repository.get_user_by_email(email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await averify_password(password, user.hashed_password):
             return None
         if not user.is_active:
             return None
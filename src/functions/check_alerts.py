@@ -2,33 +2,121 @@
 Lambda function to check alerts and send Telegram notifications
 Uses storage abstraction to get alerts
 """
+import asyncio
 import json
+import logging
+import operator
 import os
-import sys
-from telegram import Bot
-from telegram.request import HTTPXRequest
+from collections import defaultdict
+from typing import Any, Dict
 
-# Add parent directory to path to import app modules
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import msgspec
 
 from app.db.repositories import get_alert_repository
 
 # Environment variables
 TELEGRAM_BOT_TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN', '')
 
+# Per-alert diagnostics go through this logger at DEBUG, so production runs
+# (LOG_LEVEL=INFO) skip formatting them entirely
+logger = logging.getLogger(__name__)
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
+
+# Created on first use and kept for the lifetime of the container, so warm
+# invocations reuse its connection pool (and TLS sessions) to Telegram
+bot = None
+
+# The bot's HTTP client is bound to the loop it first ran on, so every
+# invocation runs on this container-wide loop instead of asyncio.run()
+_event_loop = None
+
+
+# Alert condition -> comparison of (current_rate, target_rate) that triggers it
+_CONDITION_MET = {
+    'above': operator.ge,
+    'below': operator.le,
+}
+
+
+def _never_met(current_rate, target_rate):
+    """Unknown conditions never trigger"""
+    return False
+
+
+# Upper bound for one send_message, so a slow chat cannot use up the
+# Lambda's timeout; a timed-out send is logged and not retried
+SEND_TIMEOUT_SECONDS = 3.0
+
+# Telegram rejects message texts longer than this
+_TELEGRAM_MESSAGE_LIMIT = 4096
+_MESSAGE_SEPARATOR = "\n\n"
+
+
+class RateDetail(msgspec.Struct):
+    """Detail of a "Rate Updated" event published by fetch_rates"""
+    base_currency: str = ""
+    rates: Dict[str, Any] = {}  # {currency_code: {TTS, TTB, DEAL_BAS_R, cur_nm, ...}}
+    timestamp: str = ""
+
+
+_rate_detail_decoder = msgspec.json.Decoder(RateDetail)
+
+
 def get_telegram_bot():
-    """Create a new Telegram bot instance for each use"""
-    if not TELEGRAM_BOT_TOKEN:
-        return None
-    # Use HTTPXRequest with connection pool settings for Lambda
-    request = HTTPXRequest(
-        connection_pool_size=1,
-        read_timeout=5.0,
-        write_timeout=5.0,
-        connect_timeout=5.0,
-        pool_timeout=5.0
-    )
-    return Bot(token=TELEGRAM_BOT_TOKEN, request=request)
+    """Return the shared Telegram bot, creating it on first use"""
+    global bot
+    if bot is None and TELEGRAM_BOT_TOKEN:
+        # Imported here: python-telegram-bot (and httpx under it) is slow to
+        # import, and invocations that trigger nothing never need it
+        from telegram import Bot
+        from telegram.request import HTTPXRequest
+        
+        # HTTP/2 multiplexes the concurrent sends in check_alerts_async over one
+        # connection; the pool size only matters if Telegram negotiates HTTP/1.1
+        request = HTTPXRequest(
+            http_version="2",
+            connection_pool_size=8,
+            read_timeout=5.0,
+            write_timeout=5.0,
+            connect_timeout=5.0,
+            pool_timeout=5.0
+        )
+        bot = Bot(token=TELEGRAM_BOT_TOKEN, request=request)
+    return bot
+
+
+def _get_event_loop():
+    """Return the container-wide event loop, creating it on first use"""
+    global _event_loop
+    if _event_loop is None or _event_loop.is_closed():
+        _event_loop = asyncio.new_event_loop()
+    return _event_loop
+
+
+def _coalesce_by_chat(to_send):
+    """Join triggered alert messages per chat into as few Telegram messages as fit.
+
+    Returns (chat_id, alert_ids, text) tuples; a chat's messages are split
+    into several only when joining them would exceed Telegram's text limit.
+    """
+    by_chat = defaultdict(list)
+    for alert, message in to_send:
+        by_chat[alert.telegram_chat_id].append((alert.alert_id, message))
+    
+    batches = []
+    for chat_id, messages in by_chat.items():
+        alert_ids, texts, length = [], [], 0
+        for alert_id, message in messages:
+            added = len(message) + (len(_MESSAGE_SEPARATOR) if texts else 0)
+            if texts and length + added > _TELEGRAM_MESSAGE_LIMIT:
+                batches.append((chat_id, alert_ids, _MESSAGE_SEPARATOR.join(texts)))
+                alert_ids, texts, length = [], [], 0
+                added = len(message)
+            alert_ids.append(alert_id)
+            texts.append(message)
+            length += added
+        batches.append((chat_id, alert_ids, _MESSAGE_SEPARATOR.join(texts)))
+    return batches
 
 
 async def check_alerts_async(event):
@@ -36,31 +124,28 @@ async def check_alerts_async(event):
     Checks alerts against current rates and sends Telegram notifications
     Triggered by EventBridge when rates are updated
     """
-    # Parse EventBridge event
-    if isinstance(event, dict) and 'source' in event and event.get('source') == 'currency.tracker':
-        if isinstance(event.get('detail'), str):
-            rate_data = json.loads(event['detail'])
-        else:
-            rate_data = event.get('detail', {})
-        
-        base_currency = rate_data.get('base_currency')
-        rates = rate_data.get('rates', {})
-        timestamp = rate_data.get('timestamp', '')
-    elif isinstance(event, dict) and 'detail' in event:
-        if isinstance(event['detail'], str):
-            rate_data = json.loads(event['detail'])
-        else:
-            rate_data = event.get('detail', {})
-        
-        base_currency = rate_data.get('base_currency')
-        rates = rate_data.get('rates', {})
-        timestamp = rate_data.get('timestamp', '')
-    else:
+    # Parse EventBridge event (the detail may arrive as a JSON string or a dict)
+    if not isinstance(event, dict) or 'detail' not in event:
         return {
             'statusCode': 400,
             'body': json.dumps({'error': 'Invalid event format', 'received': str(event)[:200]})
         }
     
+    detail = event['detail']
+    try:
+        if isinstance(detail, str):
+            rate_data = _rate_detail_decoder.decode(detail)
+        else:
+            rate_data = msgspec.convert(detail or {}, RateDetail)
+    except msgspec.MsgspecError as e:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({'error': f'Invalid event detail: {str(e)}'})
+        }
+    base_currency = rate_data.base_currency
+    rates = rate_data.rates
+    timestamp = rate_data.timestamp
+    
     if not base_currency or not rates:
         return {
             'statusCode': 400,
@@ -69,38 +154,38 @@ async def check_alerts_async(event):
     
     # Get storage and fetch active alerts for this base currency
     repository = get_alert_repository()
-    alerts = await repository.get_active_alerts_by_base_currency(base_currency)
+    # Only alerts on currencies present in this rate update can trigger
+    alerts = await repository.get_active_alerts_for_currencies(base_currency, rates.keys())
     
     print(f"Found {len(alerts)} active alerts for base currency {base_currency}")
-    print(f"Rates available for currencies: {list(rates.keys())[:10]}...")  # Log first 10 currencies
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Rates available for currencies: {list(rates.keys())[:10]}...")  # Log first 10 currencies
     
     triggered_alerts = []
+    to_send = []
     
+    # Alerts sharing a (currency, rate type) share one current rate, so
+    # normalise the key and resolve the rate once per group
+    by_key = defaultdict(list)
     for alert in alerts:
-        target_currency = alert.target_currency.upper()
-        target_rate = alert.target_rate
-        condition = alert.condition.lower()
-        rate_type = alert.rate_type.upper()  # TTS, TTB, or DEAL_BAS_R
-        telegram_chat_id = alert.telegram_chat_id
-        
-        print(f"Processing alert: {alert.alert_id}")
-        print(f"  Target currency: {target_currency}, Target rate: {target_rate}, Condition: {condition}, Rate type: {rate_type}")
-        
+        by_key[(alert.target_currency.upper(), alert.rate_type.upper())].append(alert)
+    
+    for (target_currency, rate_type), group in by_key.items():
         # Get current rate for target currency
         currency_data = rates.get(target_currency)
         
         if currency_data is None:
-            print(f"Currency {target_currency} not found in rates. Available currencies: {list(rates.keys())}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Currency {target_currency} not found in rates. Available currencies: {list(rates.keys())}")
             continue
         
-        print(f"  Found currency data for {target_currency}: {currency_data}")
-        
         # KoreaExim API response format: {currency_code: {TTS, TTB, DEAL_BAS_R, ...}}
         if isinstance(currency_data, dict):
             # Select rate based on rate_type
             current_rate = currency_data.get(rate_type)
             if current_rate is None:
-                print(f"Rate type {rate_type} not found for currency {target_currency}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Rate type {rate_type} not found for currency {target_currency}")
                 continue
             current_rate = float(current_rate)
             cur_nm = currency_data.get('cur_nm', target_currency)
@@ -109,22 +194,20 @@ async def check_alerts_async(event):
             current_rate = float(currency_data)
             cur_nm = target_currency
         
-        should_alert = False
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Checking {len(group)} alerts on {target_currency} ({rate_type}), current rate: {current_rate}")
         
-        print(f"  Current rate ({rate_type}): {current_rate}, Target: {target_rate}, Condition: {condition}")
+        # One C-level comparison per alert ("above": rate >= target, "below": rate <= target)
+        triggered = [
+            alert for alert in group
+            if _CONDITION_MET.get(alert.condition.lower(), _never_met)(current_rate, alert.target_rate)
+        ]
         
-        # Check condition
-        if condition == 'above' and current_rate >= target_rate:
-            should_alert = True
-            print(f"  ✅ Condition met: {current_rate} >= {target_rate}")
-        elif condition == 'below' and current_rate <= target_rate:
-            should_alert = True
-            print(f"  ✅ Condition met: {current_rate} <= {target_rate}")
-        else:
-            print(f"  ❌ Condition not met: {current_rate} {condition} {target_rate}")
-        
-        if should_alert:
-            # Send Telegram notification
+        for alert in triggered:
+            target_rate = alert.target_rate
+            condition = alert.condition.lower()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"  ✅ Alert {alert.alert_id}: {current_rate} {condition} {target_rate}")
             message = (
                 f"🔔 Currency Alert Triggered!\n\n"
                 f"📊 {alert.base_currency}/{alert.target_currency} ({cur_nm})\n"
@@ -132,31 +215,31 @@ async def check_alerts_async(event):
                 f"💰 Current Rate ({rate_type}): {current_rate}\n"
                 f"⏰ {timestamp}"
             )
-            
-            try:
-                bot = get_telegram_bot()
-                if bot:
-                    # Use async method for sending messages
-                    await bot.send_message(
-                        chat_id=telegram_chat_id,
-                        text=message
-                    )
-                    # Close the bot connection properly
-                    await bot.close()
-                    triggered_alerts.append(alert.alert_id)
-                    print(f"Successfully sent alert to chat {telegram_chat_id} for alert {alert.alert_id}")
+            to_send.append((alert, message))
+    
+    if to_send:
+        bot = get_telegram_bot()
+        if bot:
+            batches = _coalesce_by_chat(to_send)
+            # Send one message per chat (per 4096-char chunk) concurrently over
+            # the shared bot; one failed or hung chat must not fail the others
+            results = await asyncio.gather(
+                *(
+                    asyncio.wait_for(bot.send_message(chat_id=chat_id, text=text), timeout=SEND_TIMEOUT_SECONDS)
+                    for chat_id, _, text in batches
+                ),
+                return_exceptions=True,
+            )
+            for (chat_id, alert_ids, _), result in zip(batches, results):
+                if isinstance(result, Exception):
+                    print(f"Error sending Telegram message to chat {chat_id}: {str(result) or type(result).__name__}")
                 else:
-                    print(f"Telegram bot not configured. Would send: {message}")
-            except Exception as e:
-                print(f"Error sending Telegram message to chat {telegram_chat_id}: {str(e)}")
-                # Try to close bot if it exists
-                try:
-                    bot = get_telegram_bot()
-                    if bot:
-                        await bot.close()
-                except:
-                    pass
-                # Don't fail the entire function if one message fails
+                    triggered_alerts.extend(alert_ids)
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(f"Successfully sent {len(alert_ids)} alerts to chat {chat_id}")
+        else:
+            for _, message in to_send:
+                print(f"Telegram bot not configured. Would send: {message}")
     
     return {
         'statusCode': 200,
@@ -171,8 +254,7 @@ async def check_alerts_async(event):
 def lambda_handler(event, context):
     """Lambda handler"""
     try:
-        import asyncio
-        return asyncio.run(check_alerts_async(event))
+        return _get_event_loop().run_until_complete(check_alerts_async(event))
     except Exception as e:
         print(f"Error in check_alerts: {str(e)}")
         return {
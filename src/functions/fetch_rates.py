@@ -2,14 +2,14 @@
 Lambda function to fetch currency rates from KoreaExim API
 Uses storage abstraction to get active alerts
 """
+import asyncio
 import json
 import os
-import sys
+import time
+from operator import attrgetter
 from datetime import datetime, UTC
 import boto3
-
-# Add parent directory to path to import app modules
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import orjson
 
 from app.db.repositories import get_alert_repository
 from app.clients.exchange_rate_client import KoreaEximExchangeRateClient
@@ -18,21 +18,50 @@ from app.clients.exchange_rate_client import KoreaEximExchangeRateClient
 KOREAEXIM_AUTHKEY = os.environ.get('KOREAEXIM_AUTHKEY', '')
 EVENTBRIDGE_BUS = os.environ.get('EVENTBRIDGE_BUS', 'currency-events')
 
-eventbridge = boto3.client('events')
+# Created on first publish: building the client loads the EventBridge
+# service model, which invocations that return early never need
+eventbridge = None
+
+# Event detail keys for each currency, read off ExchangeRate in one call
+_RATE_DETAIL_KEYS = ('cur_unit', 'cur_nm', 'TTS', 'TTB', 'DEAL_BAS_R')
+_get_rate_detail = attrgetter('cur_unit', 'cur_nm', 'tts', 'ttb', 'deal_bas_r')
+
+# KoreaExim publishes once a day, so warm invocations reuse the last rates
+# fetched for today's date for a few minutes instead of calling the API again
+_RATE_CACHE_TTL_SECONDS = 300
+_rate_cache = {'key': None, 'val': None, 'ts': 0.0}
+
+# Kept for the lifetime of the container so the shared HTTP session
+# (bound to this loop) is reused across warm invocations
+_event_loop = None
+
+
+def _get_event_loop():
+    """Return the container-wide event loop, creating it on first use"""
+    global _event_loop
+    if _event_loop is None or _event_loop.is_closed():
+        _event_loop = asyncio.new_event_loop()
+    return _event_loop
+
+
+def get_eventbridge_client():
+    """Return the shared EventBridge client, creating it on first use"""
+    global eventbridge
+    if eventbridge is None:
+        eventbridge = boto3.client('events')
+    return eventbridge
 
 
 async def fetch_rates_async():
     """Async function to fetch rates from KoreaExim API"""
     repository = get_alert_repository()
     
-    # Get all active alerts
-    alerts = await repository.list_alerts(is_active=True)
-    
-    # if not alerts:
-    #     return {
-    #         'statusCode': 200,
-    #         'body': json.dumps({'message': 'No active alerts to process'})
-    #     }
+    # Nothing can trigger: skip the KoreaExim call and the EventBridge publish
+    if not await repository.has_active_alerts():
+        return {
+            'statusCode': 200,
+            'body': json.dumps({'message': 'No active alerts to process'})
+        }
     
     try:
         # Initialize KoreaExim API client
@@ -44,18 +73,24 @@ async def fetch_rates_async():
         today = datetime.now().strftime("%Y%m%d")
         yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y%m%d")
         
-        print(f"Attempting to fetch rates for date: {today}")
         exchange_rates = None
-        try:
-            exchange_rates = client.fetch_rates(searchdate=today, data="AP01")
-        except Exception as e:
-            print(f"Failed to fetch rates for {today}: {str(e)}")
-            print(f"Trying yesterday's date: {yesterday}")
+        if _rate_cache['key'] == today and time.monotonic() - _rate_cache['ts'] < _RATE_CACHE_TTL_SECONDS:
+            print(f"Using cached rates for date: {today}")
+            exchange_rates = _rate_cache['val']
+        else:
+            print(f"Attempting to fetch rates for date: {today}")
             try:
-                exchange_rates = client.fetch_rates(searchdate=yesterday, data="AP01")
-            except Exception as e2:
-                print(f"Failed to fetch rates for {yesterday}: {str(e2)}")
-                raise e  # Raise original error
+                exchange_rates = await client.fetch_rates(searchdate=today, data="AP01")
+            except Exception as e:
+                print(f"Failed to fetch rates for {today}: {str(e)}")
+                print(f"Trying yesterday's date: {yesterday}")
+                try:
+                    exchange_rates = await client.fetch_rates(searchdate=yesterday, data="AP01")
+                except Exception as e2:
+                    print(f"Failed to fetch rates for {yesterday}: {str(e2)}")
+                    raise e  # Raise original error
+            if exchange_rates:
+                _rate_cache.update(key=today, val=exchange_rates, ts=time.monotonic())
         
         if not exchange_rates:
             return {
@@ -64,41 +99,38 @@ async def fetch_rates_async():
             }
         
         # Convert exchange rate data to dictionary (store TTS, TTB, DEAL_BAS_R by currency code)
-        rates_by_currency = {}
-        for rate in exchange_rates:
-            currency_code = rate.cur_unit.upper()
-            rates_by_currency[currency_code] = {
-                'cur_unit': rate.cur_unit,
-                'cur_nm': rate.cur_nm,
-                'TTS': rate.tts,
-                'TTB': rate.ttb,
-                'DEAL_BAS_R': rate.deal_bas_r
-            }
+        rates_by_currency = {
+            rate.cur_unit: dict(zip(_RATE_DETAIL_KEYS, _get_rate_detail(rate)))
+            for rate in exchange_rates
+        }
         
         # KoreaExim API uses KRW as base, so base_currency is always KRW
         base_currency = "KRW"
         
-        # Publish rate update event to EventBridge
-        eventbridge.put_events(
+        # Publish rate update event to EventBridge (off the event loop, like
+        # the repositories' boto3 calls, so it can overlap other awaits)
+        await asyncio.to_thread(
+            get_eventbridge_client().put_events,
             Entries=[{
                 'Source': 'currency.tracker',
                 'DetailType': 'Rate Updated',
-                'Detail': json.dumps({
+                # orjson serializes the ~40-currency payload natively; EventBridge wants str
+                'Detail': orjson.dumps({
                     'base_currency': base_currency,
                     'rates': rates_by_currency,  # {currency_code: {TTS, TTB, DEAL_BAS_R, ...}}
                     'timestamp': datetime.now(UTC).isoformat()
-                }),
+                }).decode(),
                 'EventBusName': EVENTBRIDGE_BUS
             }]
         )
         
         return {
             'statusCode': 200,
-            'body': json.dumps({
+            'body': orjson.dumps({
                 'message': f'Fetched rates for {len(rates_by_currency)} currencies',
                 'currencies': list(rates_by_currency.keys()),
                 'base_currency': base_currency
-            })
+            }).decode()
         }
         
     except Exception as e:
@@ -114,8 +146,7 @@ def lambda_handler(event, context):
     Fetches currency rates and publishes to EventBridge
     """
     try:
-        import asyncio
-        return asyncio.run(fetch_rates_async())
+        return _get_event_loop().run_until_complete(fetch_rates_async())
     except Exception as e:
         print(f"Error in fetch_rates: {str(e)}")
         return {
@@ -0,0 +1,8 @@
+"""
+Frozen wall-clock instant shared by conftest and the tests
+"""
+from datetime import UTC, datetime
+
+# Wall-clock "now" for the whole session; tests that need time to pass
+# nest their own time_machine.travel
+FROZEN_NOW = datetime(2025, 1, 1, tzinfo=UTC)
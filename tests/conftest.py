@@ -2,32 +2,36 @@
 import os
 import pytest
 import boto3
+import time_machine
 from moto import mock_aws
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, create_autospec, patch
+
+from _time import FROZEN_NOW
+
+
+# Environment needed before app modules are imported (test defaults only)
+TEST_ENV_DEFAULTS = {
+    "ALERTS_TABLE_NAME": "currency-alerts",
+    "USERS_TABLE_NAME": "users",
+    "TELEGRAM_BOT_TOKEN": "test-token",
+    "KOREAEXIM_AUTHKEY": "test-authkey",
+    "AWS_REGION": "us-east-1",
+    "EVENTBRIDGE_BUS": "currency-events",
+    "SECRET_KEY": "test-secret-key",
+    # bcrypt's minimum cost: hashing stays real but takes ~1ms instead of ~250ms
+    "BCRYPT_ROUNDS": "4",
+}
 
 
 def pytest_configure(config):
     """Configure pytest - runs before test collection."""
     # Set required environment variables before any modules are imported
-    # This prevents ValidationError when Settings() is instantiated at module level
-    if "ALERTS_TABLE_NAME" not in os.environ:
-        os.environ["ALERTS_TABLE_NAME"] = "currency-alerts"
-    if "USERS_TABLE_NAME" not in os.environ:
-        os.environ["USERS_TABLE_NAME"] = "users"
-    # Set other optional environment variables with test defaults
-    if "TELEGRAM_BOT_TOKEN" not in os.environ:
-        os.environ["TELEGRAM_BOT_TOKEN"] = "test-token"
-    if "KOREAEXIM_AUTHKEY" not in os.environ:
-        os.environ["KOREAEXIM_AUTHKEY"] = "test-authkey"
-    if "AWS_REGION" not in os.environ:
-        os.environ["AWS_REGION"] = "us-east-1"
-    if "EVENTBRIDGE_BUS" not in os.environ:
-        os.environ["EVENTBRIDGE_BUS"] = "currency-events"
-    if "SECRET_KEY" not in os.environ:
-        os.environ["SECRET_KEY"] = "test-secret-key"
+    # This prevents ValidationError when Settings() is instantiated at module level.
+    # Values already set in the environment win over these test defaults.
+    os.environ.update({key: value for key, value in TEST_ENV_DEFAULTS.items() if key not in os.environ})
     
-    # Mock boto3.client for EventBridge to avoid region errors during import
-    # This is needed because fetch_rates.py creates eventbridge client at module level
+    # Mock boto3.client for EventBridge so fetch_rates never builds a real
+    # client (it creates one on first publish) or hits region errors
     mock_eb_client = MagicMock()
     original_boto3_client = boto3.client
     def mock_boto3_client(service_name, **kwargs):
@@ -39,6 +43,13 @@ def pytest_configure(config):
     boto3.client = mock_boto3_client
 
 
+@pytest.fixture(scope="session", autouse=True)
+def frozen_time():
+    """Freeze datetime.now()/time.time() at FROZEN_NOW (monotonic clocks still run)."""
+    with time_machine.travel(FROZEN_NOW, tick=False) as traveller:
+        yield traveller
+
+
 @pytest.fixture(scope="session")
 def aws_credentials():
     """Mocked AWS Credentials for moto."""
@@ -48,15 +59,33 @@ def aws_credentials():
     os.environ["AWS_SESSION_TOKEN"] = "testing"
     os.environ["AWS_DEFAULT_REGION"] = "us-east-1"
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def dynamodb_client(aws_credentials):
-    """Mocked DynamoDB client."""
+    """Mocked DynamoDB client (one moto backend for the whole session)."""
     with mock_aws():
         yield boto3.client("dynamodb", region_name="us-east-1")
 
-@pytest.fixture(scope="function")
-def alerts_table(dynamodb_client):
-    """Create a mock DynamoDB table for alerts."""
+@pytest.fixture(scope="session")
+def dynamodb_resource(dynamodb_client):
+    """Mocked DynamoDB resource, shared so tests don't rebuild one each time."""
+    return boto3.resource("dynamodb", region_name="us-east-1")
+
+def _truncate_table(dynamodb_resource, table_name, key_name):
+    """Delete every item from a mock table, leaving the table itself in place."""
+    table = dynamodb_resource.Table(table_name)
+    scan_kwargs = {"ProjectionExpression": "#k", "ExpressionAttributeNames": {"#k": key_name}}
+    with table.batch_writer() as batch:
+        while True:
+            response = table.scan(**scan_kwargs)
+            for item in response["Items"]:
+                batch.delete_item(Key={key_name: item[key_name]})
+            if "LastEvaluatedKey" not in response:
+                break
+            scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
+@pytest.fixture(scope="session")
+def _alerts_table_session(dynamodb_client):
+    """Create the mock DynamoDB table for alerts once per session."""
     table_name = "currency-alerts"
     dynamodb_client.create_table(
         TableName=table_name,
@@ -84,8 +113,14 @@ def alerts_table(dynamodb_client):
     return table_name
 
 @pytest.fixture(scope="function")
-def users_table(dynamodb_client):
-    """Create a mock DynamoDB table for users."""
+def alerts_table(_alerts_table_session, dynamodb_resource):
+    """Mock DynamoDB alerts table, emptied after each test."""
+    yield _alerts_table_session
+    _truncate_table(dynamodb_resource, _alerts_table_session, "alert_id")
+
+@pytest.fixture(scope="session")
+def _users_table_session(dynamodb_client):
+    """Create the mock DynamoDB table for users once per session."""
     table_name = "users"
     dynamodb_client.create_table(
         TableName=table_name,
@@ -105,3 +140,26 @@ def users_table(dynamodb_client):
     )
     os.environ["USERS_TABLE_NAME"] = table_name
     return table_name
+
+@pytest.fixture(scope="function")
+def users_table(_users_table_session, dynamodb_resource):
+    """Mock DynamoDB users table, emptied after each test."""
+    yield _users_table_session
+    _truncate_table(dynamodb_resource, _users_table_session, "user_id")
+
+
+# Session-wide patches of the Lambda functions' module globals; the
+# function-scoped mock_* fixtures in test_functions.py reset them per test
+@pytest.fixture(scope="session")
+def _patched_telegram_bot():
+    from telegram import Bot
+
+    # Spec'd once per session: calls are checked against Bot's real signatures
+    mock_bot = create_autospec(Bot, instance=True, spec_set=True)
+    with patch("functions.check_alerts.bot", mock_bot):
+        yield mock_bot
+
+@pytest.fixture(scope="session")
+def _patched_eventbridge():
+    with patch("functions.fetch_rates.eventbridge") as mock_eb:
+        yield mock_eb
@@ -1,10 +1,15 @@
+import dataclasses
+import itertools
 import uuid
-from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 
+import httpx
 import pytest
-from fastapi.testclient import TestClient
+import pytest_asyncio
 
+from _time import FROZEN_NOW
 from app.main import app
 from app.api.v1.alerts import get_alert_service
 from app.api.v1.auth import get_user_service
@@ -12,19 +17,59 @@ from app.core.dependencies import get_current_user
 from app.db.models.alert import Alert
 from app.db.models.user import User
 from app.schemas.alert import AlertCreate, AlertUpdate
+from app.services.alert_service import AlertAccessDeniedError, AlertNotFoundError
 from app.schemas.user import UserCreate
 
+# Mark all tests in this file as asyncio
+pytestmark = pytest.mark.asyncio
+
+
+def _asgi_client() -> httpx.AsyncClient:
+    """Client that calls the ASGI app in-process on the test's event loop"""
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+# Fake records are created at FROZEN_NOW; updates step forward a microsecond at
+# a time so updated_at still changes (and increases) on every write
+_update_counter = itertools.count(1)
+
+
+def _next_update_time() -> datetime:
+    return FROZEN_NOW + timedelta(microseconds=next(_update_counter))
+
+
+# Alert owned by someone other than test_user; tests add a copy, since the
+# fake service stores (and may update) the instance it is given
+OTHER_USER_ALERT = Alert(
+    alert_id="alert-other-user",
+    user_id="different-user",
+    telegram_chat_id="chat-other",
+    base_currency="KRW",
+    target_currency="JPY",
+    target_rate=900.0,
+    condition="below",
+    rate_type="DEAL_BAS_R",
+    is_active=True,
+)
+
 
 class FakeAlertService:
     """Simple in-memory alert service used for FastAPI endpoint tests."""
 
     def __init__(self):
         self.alerts: Dict[str, Alert] = {}
+        # user_id -> {alert_id: Alert}, mirroring the user_id GSI
+        self.by_user: Dict[str, Dict[str, Alert]] = defaultdict(dict)
 
     def add_alert(self, alert: Alert) -> Alert:
         self.alerts[alert.alert_id] = alert
+        self.by_user[alert.user_id][alert.alert_id] = alert
         return alert
 
+    def clear(self) -> None:
+        self.alerts.clear()
+        self.by_user.clear()
+
     async def create_alert(self, alert_data: AlertCreate) -> Alert:
         alert = Alert(
             alert_id=str(uuid.uuid4()),
@@ -36,64 +81,85 @@ class FakeAlertService:
             condition=alert_data.condition,
             rate_type=alert_data.rate_type,
             is_active=True,
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc),
+            created_at=FROZEN_NOW,
+            updated_at=FROZEN_NOW,
         )
-        self.alerts[alert.alert_id] = alert
-        return alert
+        return self.add_alert(alert)
 
     async def list_alerts(
         self,
         user_id: Optional[str] = None,
         is_active: Optional[bool] = None,
     ) -> List[Alert]:
-        alerts = list(self.alerts.values())
-        if user_id is not None:
-            alerts = [alert for alert in alerts if alert.user_id == user_id]
-        if is_active is not None:
-            alerts = [alert for alert in alerts if alert.is_active == is_active]
-        return alerts
+        alerts = self.by_user.get(user_id, {}).values() if user_id is not None else self.alerts.values()
+        if is_active is None:
+            return list(alerts)
+        return [alert for alert in alerts if alert.is_active == is_active]
+
+    async def list_user_alerts(
+        self,
+        user_id: str,
+        is_active: Optional[bool] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Alert], Optional[str]]:
+        alerts = await self.list_alerts(user_id=user_id, is_active=is_active)
+        if cursor is not None:
+            ids = [alert.alert_id for alert in alerts]
+            alerts = alerts[ids.index(cursor) + 1:]
+        if limit is None or len(alerts) <= limit:
+            return alerts, None
+        return alerts[:limit], alerts[limit - 1].alert_id
 
     async def get_alert(self, alert_id: str) -> Optional[Alert]:
         return self.alerts.get(alert_id)
 
-    async def update_alert(self, alert_id: str, update_data: AlertUpdate) -> Optional[Alert]:
+    def _owned_alert(self, alert_id: str, user_id: str) -> Alert:
         alert = self.alerts.get(alert_id)
         if not alert:
-            return None
+            raise AlertNotFoundError(alert_id)
+        if alert.user_id != user_id:
+            raise AlertAccessDeniedError(alert_id)
+        return alert
+
+    async def update_alert(self, alert_id: str, user_id: str, update_data: AlertUpdate) -> Alert:
+        alert = self._owned_alert(alert_id, user_id)
         update_dict = update_data.model_dump(exclude_unset=True)
         for key, value in update_dict.items():
             setattr(alert, key, value)
-        alert.updated_at = datetime.now(timezone.utc)
+        alert.updated_at = _next_update_time()
         return alert
 
-    async def delete_alert(self, alert_id: str) -> bool:
-        return self.alerts.pop(alert_id, None) is not None
+    async def delete_alert(self, alert_id: str, user_id: str) -> None:
+        self._owned_alert(alert_id, user_id)
+        del self.alerts[alert_id]
+        del self.by_user[user_id][alert_id]
 
-    async def toggle_alert(self, alert_id: str) -> Optional[Alert]:
-        alert = self.alerts.get(alert_id)
-        if not alert:
-            return None
+    async def toggle_alert(self, alert_id: str, user_id: str) -> Alert:
+        alert = self._owned_alert(alert_id, user_id)
         alert.is_active = not alert.is_active
-        alert.updated_at = datetime.now(timezone.utc)
+        alert.updated_at = _next_update_time()
         return alert
 
 
 class FakeUserService:
     """Simple in-memory user service used for FastAPI auth endpoint tests."""
 
+    # Case-insensitive email key (casefold also folds non-ASCII case pairs)
+    _email_key = staticmethod(str.casefold)
+
     def __init__(self):
         self.users: Dict[str, User] = {}
-        self.emails: Dict[str, str] = {}  # email -> user_id mapping
+        self.emails: Dict[str, str] = {}  # email key -> user_id mapping
 
     def add_user(self, user: User) -> User:
         self.users[user.user_id] = user
-        self.emails[user.email.lower()] = user.user_id
+        self.emails[self._email_key(user.email)] = user.user_id
         return user
 
     async def create_user(self, user_data: UserCreate) -> User:
         # Check if user already exists
-        if user_data.email.lower() in self.emails:
+        if self._email_key(user_data.email) in self.emails:
             raise ValueError("User with this email already exists")
 
         user = User(
@@ -102,14 +168,14 @@ class FakeUserService:
             telegram_chat_id=user_data.telegram_chat_id,
             hashed_password=f"hashed_{user_data.password}",  # Simplified for testing
             is_active=True,
-            created_at=datetime.now(timezone.utc),
-            updated_at=datetime.now(timezone.utc),
+            created_at=FROZEN_NOW,
+            updated_at=FROZEN_NOW,
         )
         self.add_user(user)
         return user
 
     async def authenticate_user(self, email: str, password: str) -> Optional[User]:
-        user_id = self.emails.get(email.lower())
+        user_id = self.emails.get(self._email_key(email))
         if not user_id:
             return None
         user = self.users.get(user_id)
@@ -147,22 +213,28 @@ def fake_alert_service() -> FakeAlertService:
     return FakeAlertService()
 
 
+@pytest_asyncio.fixture(scope="module")
+async def client():
+    """One ASGI client for the whole module; tests swap dependency overrides around it"""
+    async with _asgi_client() as client:
+        yield client
+
+
 @pytest.fixture
-def api_client(fake_alert_service: FakeAlertService, test_user: User):
+def api_client(client: httpx.AsyncClient, fake_alert_service: FakeAlertService, test_user: User):
     async def override_current_user():
         return test_user
 
     app.dependency_overrides[get_current_user] = override_current_user
     app.dependency_overrides[get_alert_service] = lambda: fake_alert_service
 
-    client = TestClient(app)
     yield client
 
     app.dependency_overrides.clear()
-    fake_alert_service.alerts.clear()
+    fake_alert_service.clear()
 
 
-def test_create_alert_returns_created_alert(api_client: TestClient):
+async def test_create_alert_returns_created_alert(api_client: httpx.AsyncClient):
     payload = {
         "target_currency": "usd",
         "target_rate": 1300.5,
@@ -170,7 +242,7 @@ def test_create_alert_returns_created_alert(api_client: TestClient):
         "rate_type": "TTS",
     }
 
-    response = api_client.post("/api/v1/alerts", json=payload)
+    response = await api_client.post("/api/v1/alerts", json=payload)
 
     assert response.status_code == 201
     body = response.json()
@@ -181,8 +253,28 @@ def test_create_alert_returns_created_alert(api_client: TestClient):
     assert "alert_id" in body
 
 
-def test_list_alerts_filters_by_active_flag(
-    api_client: TestClient,
+async def test_create_alert_normalizes_and_validates_enums(api_client: httpx.AsyncClient):
+    payload = {
+        "target_currency": "eur",
+        "target_rate": 1400.0,
+        "condition": "BELOW",
+        "rate_type": "deal_bas_r",
+    }
+
+    response = await api_client.post("/api/v1/alerts", json=payload)
+
+    assert response.status_code == 201
+    body = response.json()
+    assert body["condition"] == "below"
+    assert body["rate_type"] == "DEAL_BAS_R"
+
+    for field, value in [("condition", "sideways"), ("rate_type", "SPOT"), ("target_currency", "U$D")]:
+        response = await api_client.post("/api/v1/alerts", json={**payload, field: value})
+        assert response.status_code == 422
+
+
+async def test_list_alerts_filters_by_active_flag(
+    api_client: httpx.AsyncClient,
     fake_alert_service: FakeAlertService,
     test_user: User,
 ):
@@ -212,46 +304,87 @@ def test_list_alerts_filters_by_active_flag(
     fake_alert_service.add_alert(active_alert)
     fake_alert_service.add_alert(inactive_alert)
 
-    response = api_client.get("/api/v1/alerts", params={"is_active": True})
+    response = await api_client.get("/api/v1/alerts", params={"is_active": True})
 
     assert response.status_code == 200
     body = response.json()
     assert body["total"] == 1
     assert body["alerts"][0]["alert_id"] == "alert-active"
     assert body["alerts"][0]["target_currency"] == "USD"
+    assert body["alerts"][0]["target_rate"] == 1200.0
+    assert body["alerts"][0]["rate_type"] == "TTS"
 
 
-def test_get_alert_forbidden_for_other_user(
-    api_client: TestClient,
+async def test_list_alerts_paginates_with_cursor(
+    api_client: httpx.AsyncClient,
     fake_alert_service: FakeAlertService,
+    test_user: User,
 ):
-    other_user_alert = Alert(
-        alert_id="alert-other-user",
-        user_id="different-user",
-        telegram_chat_id="chat-other",
-        base_currency="KRW",
-        target_currency="JPY",
-        target_rate=900.0,
-        condition="below",
-        rate_type="DEAL_BAS_R",
-        is_active=True,
-    )
-    fake_alert_service.add_alert(other_user_alert)
+    for index in range(3):
+        fake_alert_service.add_alert(
+            Alert(
+                alert_id=f"alert-{index}",
+                user_id=test_user.user_id,
+                telegram_chat_id=test_user.telegram_chat_id,
+                base_currency="KRW",
+                target_currency="USD",
+                target_rate=1200.0 + index,
+                condition="above",
+                rate_type="TTS",
+                is_active=True,
+            )
+        )
+
+    first_page = (await api_client.get("/api/v1/alerts", params={"limit": 2})).json()
+    assert [alert["alert_id"] for alert in first_page["alerts"]] == ["alert-0", "alert-1"]
+    assert first_page["next_cursor"] == "alert-1"
+
+    second_page = (
+        await api_client.get("/api/v1/alerts", params={"limit": 2, "cursor": first_page["next_cursor"]})
+    ).json()
+    assert [alert["alert_id"] for alert in second_page["alerts"]] == ["alert-2"]
+    assert second_page["next_cursor"] is None
+
 
-    response = api_client.get("/api/v1/alerts/alert-other-user")
+async def test_get_alert_forbidden_for_other_user(
+    api_client: httpx.AsyncClient,
+    fake_alert_service: FakeAlertService,
+):
+    fake_alert_service.add_alert(dataclasses.replace(OTHER_USER_ALERT))
+
+    response = await api_client.get("/api/v1/alerts/alert-other-user")
 
     assert response.status_code == 403
     assert response.json()["detail"] == "Not authorized to access this alert"
 
 
+async def test_update_alert_forbidden_for_other_user(
+    api_client: httpx.AsyncClient,
+    fake_alert_service: FakeAlertService,
+):
+    fake_alert_service.add_alert(dataclasses.replace(OTHER_USER_ALERT))
+
+    response = await api_client.put("/api/v1/alerts/alert-other-user", json={"target_rate": 950.0})
+
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Not authorized to update this alert"
+    assert fake_alert_service.alerts["alert-other-user"].target_rate == 900.0
+
+
+async def test_delete_missing_alert_returns_404(api_client: httpx.AsyncClient):
+    response = await api_client.delete("/api/v1/alerts/does-not-exist")
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Alert not found"
+
+
 # ==================== Auth Endpoint Tests ====================
 
 @pytest.fixture
-def auth_client(fake_user_service: FakeUserService):
+def auth_client(client: httpx.AsyncClient, fake_user_service: FakeUserService):
     """Client for auth endpoints without authentication requirement."""
     app.dependency_overrides[get_user_service] = lambda: fake_user_service
 
-    client = TestClient(app)
     yield client
 
     app.dependency_overrides.clear()
@@ -259,7 +392,7 @@ def auth_client(fake_user_service: FakeUserService):
     fake_user_service.emails.clear()
 
 
-def test_register_user_success(auth_client: TestClient):
+async def test_register_user_success(auth_client: httpx.AsyncClient):
     """Test successful user registration."""
     payload = {
         "email": "newuser@example.com",
@@ -267,7 +400,7 @@ def test_register_user_success(auth_client: TestClient):
         "telegram_chat_id": "chat-456",
     }
 
-    response = auth_client.post("/api/v1/auth/register", json=payload)
+    response = await auth_client.post("/api/v1/auth/register", json=payload)
 
     assert response.status_code == 201
     body = response.json()
@@ -278,7 +411,7 @@ def test_register_user_success(auth_client: TestClient):
     assert "password" not in body  # Password should not be in response
 
 
-def test_register_user_duplicate_email(auth_client: TestClient, fake_user_service: FakeUserService):
+async def test_register_user_duplicate_email(auth_client: httpx.AsyncClient, fake_user_service: FakeUserService):
     """Test registration with duplicate email returns 400."""
     existing_user = User(
         user_id="existing-123",
@@ -295,39 +428,34 @@ def test_register_user_duplicate_email(auth_client: TestClient, fake_user_servic
         "telegram_chat_id": "chat-new",
     }
 
-    response = auth_client.post("/api/v1/auth/register", json=payload)
+    response = await auth_client.post("/api/v1/auth/register", json=payload)
 
     assert response.status_code == 400
     assert "already exists" in response.json()["detail"].lower()
 
 
-def test_register_user_invalid_email(auth_client: TestClient):
-    """Test registration with invalid email format returns 422."""
-    payload = {
-        "email": "not-an-email",
-        "password": "password123",
-        "telegram_chat_id": "chat-123",
-    }
-
-    response = auth_client.post("/api/v1/auth/register", json=payload)
-
-    assert response.status_code == 422
-
-
-def test_register_user_short_password(auth_client: TestClient):
-    """Test registration with password shorter than 8 characters returns 422."""
+@pytest.mark.parametrize(
+    "email, password",
+    [
+        ("not-an-email", "password123"),  # Invalid email format
+        ("user@example.com", "short"),  # Less than 8 characters
+    ],
+    ids=["invalid_email", "short_password"],
+)
+async def test_register_user_rejects_invalid_input(auth_client: httpx.AsyncClient, email: str, password: str):
+    """Test registration with an invalid email or a too-short password returns 422."""
     payload = {
-        "email": "user@example.com",
-        "password": "short",  # Less than 8 characters
+        "email": email,
+        "password": password,
         "telegram_chat_id": "chat-123",
     }
 
-    response = auth_client.post("/api/v1/auth/register", json=payload)
+    response = await auth_client.post("/api/v1/auth/register", json=payload)
 
     assert response.status_code == 422
 
 
-def test_login_success(auth_client: TestClient, fake_user_service: FakeUserService):
+async def test_login_success(auth_client: httpx.AsyncClient, fake_user_service: FakeUserService):
     """Test successful login returns access token."""
     # Create a user first
     user = User(
@@ -340,7 +468,7 @@ def test_login_success(auth_client: TestClient, fake_user_service: FakeUserServi
     fake_user_service.add_user(user)
 
     # Login with correct credentials
-    response = auth_client.post(
+    response = await auth_client.post(
         "/api/v1/auth/login",
         data={
             "username": "login@example.com",  # OAuth2PasswordRequestForm uses 'username' field
@@ -357,36 +485,39 @@ def test_login_success(auth_client: TestClient, fake_user_service: FakeUserServi
     assert body["user"]["user_id"] == "login-user-123"
 
 
-def test_login_wrong_password(auth_client: TestClient, fake_user_service: FakeUserService):
-    """Test login with wrong password returns 401."""
-    user = User(
-        user_id="login-user-123",
-        email="login@example.com",
-        telegram_chat_id="chat-login",
-        hashed_password="hashed_correctpass",
-        is_active=True,
-    )
-    fake_user_service.add_user(user)
-
-    response = auth_client.post(
-        "/api/v1/auth/login",
-        data={
-            "username": "login@example.com",
-            "password": "wrongpassword",
-        },
-    )
-
-    assert response.status_code == 401
-    assert "Incorrect email or password" in response.json()["detail"]
-
+@pytest.mark.parametrize(
+    "seed_user, username, password",
+    [
+        (True, "login@example.com", "wrongpassword"),  # Wrong password
+        (False, "nonexistent@example.com", "anypassword"),  # Unknown email
+        (True, "inactive@example.com", "correctpass"),  # Inactive user
+    ],
+    ids=["wrong_password", "nonexistent_user", "inactive_user"],
+)
+async def test_login_rejects_invalid_credentials(
+    auth_client: httpx.AsyncClient,
+    fake_user_service: FakeUserService,
+    seed_user: bool,
+    username: str,
+    password: str,
+):
+    """Test login failures all return the same 401."""
+    if seed_user:
+        fake_user_service.add_user(
+            User(
+                user_id=f"user-{username}",
+                email=username,
+                telegram_chat_id="chat-login",
+                hashed_password="hashed_correctpass",
+                is_active=not username.startswith("inactive"),
+            )
+        )
 
-def test_login_nonexistent_user(auth_client: TestClient):
-    """Test login with non-existent email returns 401."""
-    response = auth_client.post(
+    response = await auth_client.post(
         "/api/v1/auth/login",
         data={
-            "username": "nonexistent@example.com",
-            "password": "anypassword",
+            "username": username,
+            "password": password,
         },
     )
 
@@ -394,25 +525,17 @@ def test_login_nonexistent_user(auth_client: TestClient):
     assert "Incorrect email or password" in response.json()["detail"]
 
 
-def test_login_inactive_user(auth_client: TestClient, fake_user_service: FakeUserService):
-    """Test login with inactive user returns 401."""
-    user = User(
-        user_id="inactive-user-123",
-        email="inactive@example.com",
-        telegram_chat_id="chat-inactive",
-        hashed_password="hashed_password123",
-        is_active=False,  # Inactive user
-    )
-    fake_user_service.add_user(user)
-
-    response = auth_client.post(
-        "/api/v1/auth/login",
-        data={
-            "username": "inactive@example.com",
-            "password": "password123",
-        },
-    )
+async def test_cors_preflight_allows_api_methods_and_headers(client: httpx.AsyncClient):
+    """Preflight requests are answered for the methods and headers the API uses."""
+    headers = {
+        "Origin": "https://frontend.example.com",
+        "Access-Control-Request-Method": "PUT",
+        "Access-Control-Request-Headers": "authorization, content-type",
+    }
 
-    assert response.status_code == 401
-    assert "Incorrect email or password" in response.json()["detail"]
+    response = await client.options("/api/v1/alerts/some-id", headers=headers)
+    assert response.status_code == 200
+    assert "PUT" in response.headers["access-control-allow-methods"]
 
+    response = await client.options("/api/v1/alerts/some-id", headers={**headers, "Access-Control-Request-Method": "PATCH"})
+    assert response.status_code == 400
@@ -1,26 +1,39 @@
 
+import httpx
 import json
 import pytest
+import respx
 import uuid
+from typing import NamedTuple
 from unittest.mock import patch, MagicMock, AsyncMock
 
 from app.db.models.alert import Alert
-from app.clients.exchange_rate_client import ExchangeRate
+from app.clients.exchange_rate_client import KoreaEximExchangeRateClient
 from functions.check_alerts import check_alerts_async
 from functions.fetch_rates import fetch_rates_async
 
 # Mark all tests in this file as asyncio
 pytestmark = pytest.mark.asyncio
 
+
+class LambdaResponse(NamedTuple):
+    """A Lambda handler's response with its JSON body decoded"""
+    status: int
+    body: dict
+
+
+def parse_lambda_response(response: dict) -> LambdaResponse:
+    return LambdaResponse(response["statusCode"], json.loads(response["body"]))
+
+
 @pytest.fixture
-def mock_telegram_bot():
+def mock_telegram_bot(_patched_telegram_bot):
     """Fixture to mock the telegram bot."""
-    with patch('functions.check_alerts.bot', new_callable=MagicMock) as mock_bot:
-        # Make sure the bot object itself is truthy
-        mock_bot.send_message = MagicMock()
-        yield mock_bot
+    # Also clears side effects a previous test installed on send_message
+    _patched_telegram_bot.reset_mock(return_value=True, side_effect=True)
+    return _patched_telegram_bot
 
-async def test_check_alerts_handler_triggers_one_alert(alerts_table, mock_telegram_bot):
+async def test_check_alerts_handler_triggers_one_alert(alerts_table, dynamodb_resource, mock_telegram_bot):
     """
     Test the check_alerts lambda handler, ensuring it correctly identifies
     and triggers a single valid alert.
@@ -68,13 +81,11 @@ async def test_check_alerts_handler_triggers_one_alert(alerts_table, mock_telegr
         is_active=False,
     )
 
-    # Use boto3 resource to put items, which is what the repository uses
-    import boto3
-    dynamodb = boto3.resource("dynamodb")
-    table = dynamodb.Table(alerts_table)
-    table.put_item(Item=alert_to_trigger.to_dict())
-    table.put_item(Item=alert_not_triggered.to_dict())
-    table.put_item(Item=inactive_alert.to_dict())
+    # Use boto3 resource to put items (one BatchWriteItem), which is what the repository uses
+    table = dynamodb_resource.Table(alerts_table)
+    with table.batch_writer() as batch:
+        for alert in (alert_to_trigger, alert_not_triggered, inactive_alert):
+            batch.put_item(Item=alert.to_dict())
 
     # 2. Prepare the EventBridge event
     event = {
@@ -94,14 +105,13 @@ async def test_check_alerts_handler_triggers_one_alert(alerts_table, mock_telegr
     }
 
     # 3. Invoke the async function directly
-    response = await check_alerts_async(event)
+    response = parse_lambda_response(await check_alerts_async(event))
 
     # 4. Assertions
-    assert response["statusCode"] == 200
-    body = json.loads(response["body"])
-    assert body["message"] == "Checked 2 alerts"  # Only active alerts are checked
-    assert body["triggered"] == 1
-    assert body["alert_ids"][0] == alert_to_trigger.alert_id
+    assert response.status == 200
+    assert response.body["message"] == "Checked 2 alerts"  # Only active alerts are checked
+    assert response.body["triggered"] == 1
+    assert response.body["alert_ids"][0] == alert_to_trigger.alert_id
 
     # Assert that the telegram bot was called once
     mock_telegram_bot.send_message.assert_called_once()
@@ -114,136 +124,233 @@ async def test_check_alerts_handler_triggers_one_alert(alerts_table, mock_telegr
     assert "Current Rate (TTS): 1350.5" in call_args.kwargs['text']
 
 
+async def test_check_alerts_resolves_rate_per_currency_and_rate_type(mock_telegram_bot):
+    """Alerts are matched against the rate for their own currency and rate type."""
+    def make_alert(target_currency, rate_type, target_rate, condition):
+        return Alert(
+            alert_id=str(uuid.uuid4()),
+            user_id="user-123",
+            telegram_chat_id="chat-123",
+            base_currency="KRW",
+            target_currency=target_currency,
+            target_rate=target_rate,
+            condition=condition,
+            rate_type=rate_type,
+            is_active=True,
+        )
+
+    usd_tts = make_alert("usd", "tts", 1300.0, "above")
+    usd_ttb = make_alert("USD", "TTB", 1300.0, "above")
+    eur_tts = make_alert("EUR", "TTS", 1500.0, "below")
+    jpy_tts = make_alert("JPY", "TTS", 900.0, "below")  # no JPY rate in the event
+    repository = MagicMock()
+    repository.get_active_alerts_for_currencies = AsyncMock(return_value=[usd_tts, usd_ttb, eur_tts, jpy_tts])
+
+    event = {
+        "source": "currency.tracker",
+        "detail": {
+            "base_currency": "KRW",
+            "rates": {
+                "USD": {"TTS": 1350.0, "TTB": 1290.0, "cur_nm": "US Dollar"},
+                "EUR": {"TTS": 1450.0, "TTB": 1400.0, "cur_nm": "Euro"},
+            },
+            "timestamp": "2025-11-18T12:00:00Z",
+        },
+    }
+
+    with patch("functions.check_alerts.get_alert_repository", return_value=repository):
+        response = parse_lambda_response(await check_alerts_async(event))
+
+    assert response.body["triggered"] == 2
+    assert set(response.body["alert_ids"]) == {usd_tts.alert_id, eur_tts.alert_id}
+    # Both alerts notify the same chat, so they are coalesced into one message
+    mock_telegram_bot.send_message.assert_awaited_once()
+    text = mock_telegram_bot.send_message.call_args.kwargs["text"]
+    assert "KRW/usd (US Dollar)" in text
+    assert "KRW/EUR (Euro)" in text
+
+
+async def test_coalesce_by_chat_respects_telegram_length_limit():
+    """Messages are joined per chat and split only when over Telegram's limit."""
+    from functions.check_alerts import _coalesce_by_chat
+
+    def alert(alert_id, chat_id):
+        return MagicMock(alert_id=alert_id, telegram_chat_id=chat_id)
+
+    long_message = "x" * 3000
+    batches = _coalesce_by_chat([
+        (alert("a1", "chat-1"), "first"),
+        (alert("a2", "chat-2"), "other chat"),
+        (alert("a3", "chat-1"), "second"),
+        (alert("a4", "chat-1"), long_message),
+        (alert("a5", "chat-1"), long_message),
+    ])
+
+    assert batches == [
+        ("chat-1", ["a1", "a3", "a4"], "first\n\nsecond\n\n" + long_message),
+        ("chat-1", ["a5"], long_message),
+        ("chat-2", ["a2"], "other chat"),
+    ]
+
+
+async def test_check_alerts_times_out_hung_sends(monkeypatch, mock_telegram_bot):
+    """A send that hangs is abandoned after the timeout without blocking other chats."""
+    import asyncio
+
+    def make_alert(chat_id):
+        return Alert(
+            alert_id=str(uuid.uuid4()),
+            user_id="user-123",
+            telegram_chat_id=chat_id,
+            base_currency="KRW",
+            target_currency="USD",
+            target_rate=1300.0,
+            condition="above",
+            rate_type="TTS",
+            is_active=True,
+        )
+
+    hung_alert = make_alert("hung-chat")
+    ok_alert = make_alert("ok-chat")
+    repository = MagicMock()
+    repository.get_active_alerts_for_currencies = AsyncMock(return_value=[hung_alert, ok_alert])
+
+    async def send_message(chat_id, text):
+        if chat_id == "hung-chat":
+            await asyncio.sleep(60)
+
+    mock_telegram_bot.send_message.side_effect = send_message
+    monkeypatch.setattr("functions.check_alerts.SEND_TIMEOUT_SECONDS", 0.05)
+    event = {"detail": {"base_currency": "KRW", "rates": {"USD": {"TTS": 1350.0}}}}
+
+    with patch("functions.check_alerts.get_alert_repository", return_value=repository):
+        response = parse_lambda_response(await check_alerts_async(event))
+
+    assert response.body["alert_ids"] == [ok_alert.alert_id]
+
+
+async def test_check_alerts_rejects_malformed_events():
+    """Events without a usable detail are rejected before touching the repository."""
+    with patch("functions.check_alerts.get_alert_repository") as get_repository:
+        assert (await check_alerts_async({"source": "currency.tracker"}))["statusCode"] == 400
+        assert (await check_alerts_async("not-an-event"))["statusCode"] == 400
+        assert (await check_alerts_async({"detail": None}))["statusCode"] == 400
+        assert (await check_alerts_async({"detail": json.dumps({"base_currency": "KRW"})}))["statusCode"] == 400
+        assert (await check_alerts_async({"detail": "{not json"}))["statusCode"] == 400
+        assert (await check_alerts_async({"detail": {"base_currency": 1, "rates": {"USD": 1.0}}}))["statusCode"] == 400
+
+    get_repository.assert_not_called()
+
+
+async def test_get_telegram_bot_is_reused(monkeypatch):
+    """The bot (and its connection pool) is created once per container."""
+    from functions import check_alerts
+
+    monkeypatch.setattr(check_alerts, "bot", None)
+
+    first = check_alerts.get_telegram_bot()
+
+    assert first is not None
+    assert check_alerts.get_telegram_bot() is first
+
+
 # ==================== Fetch Rates Function Tests ====================
 
+@pytest.fixture(autouse=True)
+def clear_rate_cache():
+    """Start every test without rates cached by an earlier one."""
+    from functions import fetch_rates
+
+    fetch_rates._rate_cache.update(key=None, val=None, ts=0.0)
+    yield
+
+
+# Items as the KoreaExim API returns them (rates are comma-grouped strings)
+USD_RATE_ITEM = {"result": 1, "cur_unit": "USD", "cur_nm": "US Dollar", "ttb": "1,290", "tts": "1,350", "deal_bas_r": "1,320"}
+EUR_RATE_ITEM = {"result": 1, "cur_unit": "EUR", "cur_nm": "Euro", "ttb": "1,400", "tts": "1,450", "deal_bas_r": "1,425"}
+
+
 @pytest.fixture
 def mock_alert_repository():
-    """Fixture to mock the alert repository."""
+    """Fixture to mock the alert repository that fetch_rates reads (with active alerts)."""
     mock_repo = MagicMock()
-    mock_repo.list_alerts = AsyncMock()
-    return mock_repo
+    mock_repo.has_active_alerts = AsyncMock(return_value=True)
+    with patch('functions.fetch_rates.get_alert_repository', return_value=mock_repo):
+        yield mock_repo
 
 
 @pytest.fixture
-def mock_exchange_rate_client():
-    """Fixture to mock the KoreaExim exchange rate client."""
-    with patch('functions.fetch_rates.KoreaEximExchangeRateClient') as mock_client_class:
-        mock_client = MagicMock()
-        mock_client_class.return_value = mock_client
-        yield mock_client
+def koreaexim_api():
+    """Fixture to mock the KoreaExim API at the httpx transport layer."""
+    with respx.mock(assert_all_called=False) as router:
+        yield router.get(KoreaEximExchangeRateClient.BASE_URL)
 
 
 @pytest.fixture
-def mock_eventbridge():
+def mock_eventbridge(_patched_eventbridge):
     """Fixture to mock EventBridge client."""
-    with patch('functions.fetch_rates.eventbridge') as mock_eb:
-        yield mock_eb
+    _patched_eventbridge.reset_mock()
+    # Fresh put_events so a side effect set by one test doesn't leak into the next
+    _patched_eventbridge.put_events = MagicMock()
+    return _patched_eventbridge
 
 
 async def test_fetch_rates_no_active_alerts(
     mock_alert_repository,
-    mock_exchange_rate_client,
+    koreaexim_api,
     mock_eventbridge,
 ):
     """Test fetch_rates when there are no active alerts."""
     # Setup: No active alerts
-    mock_alert_repository.list_alerts.return_value = []
+    mock_alert_repository.has_active_alerts.return_value = False
     
-    with patch('functions.fetch_rates.get_alert_repository', return_value=mock_alert_repository):
-        response = await fetch_rates_async()
+    response = parse_lambda_response(await fetch_rates_async())
     
     # Assertions
-    assert response["statusCode"] == 200
-    body = json.loads(response["body"])
-    assert body["message"] == "No active alerts to process"
+    assert response.status == 200
+    assert response.body["message"] == "No active alerts to process"
     
     # Should not call exchange rate client or EventBridge
-    mock_exchange_rate_client.fetch_rates.assert_not_called()
+    assert not koreaexim_api.called
     mock_eventbridge.put_events.assert_not_called()
 
 
 async def test_fetch_rates_no_exchange_rates(
     mock_alert_repository,
-    mock_exchange_rate_client,
+    koreaexim_api,
     mock_eventbridge,
 ):
     """Test fetch_rates when exchange rate API returns no data."""
     # Setup: Active alerts exist but no exchange rates
-    active_alert = Alert(
-        alert_id=str(uuid.uuid4()),
-        user_id="user-123",
-        telegram_chat_id="chat-123",
-        base_currency="KRW",
-        target_currency="USD",
-        target_rate=1300.0,
-        condition="above",
-        rate_type="TTS",
-        is_active=True,
-    )
-    mock_alert_repository.list_alerts.return_value = [active_alert]
-    mock_exchange_rate_client.fetch_rates.return_value = []
+    koreaexim_api.respond(json=[])
     
-    with patch('functions.fetch_rates.get_alert_repository', return_value=mock_alert_repository):
-        response = await fetch_rates_async()
+    response = parse_lambda_response(await fetch_rates_async())
     
     # Assertions
-    assert response["statusCode"] == 200
-    body = json.loads(response["body"])
-    assert body["message"] == "No exchange rates available"
+    assert response.status == 200
+    assert response.body["message"] == "No exchange rates available"
     
     # Should call exchange rate client but not EventBridge
-    mock_exchange_rate_client.fetch_rates.assert_called_once()
+    assert koreaexim_api.call_count == 1
     mock_eventbridge.put_events.assert_not_called()
 
 
 async def test_fetch_rates_success(
     mock_alert_repository,
-    mock_exchange_rate_client,
+    koreaexim_api,
     mock_eventbridge,
 ):
     """Test successful fetch_rates that publishes to EventBridge."""
-    # Setup: Active alerts and exchange rates
-    active_alert = Alert(
-        alert_id=str(uuid.uuid4()),
-        user_id="user-123",
-        telegram_chat_id="chat-123",
-        base_currency="KRW",
-        target_currency="USD",
-        target_rate=1300.0,
-        condition="above",
-        rate_type="TTS",
-        is_active=True,
-    )
-    mock_alert_repository.list_alerts.return_value = [active_alert]
-    
-    # Mock exchange rate data
-    exchange_rates = [
-        ExchangeRate(
-            cur_unit="USD",
-            cur_nm="US Dollar",
-            ttb=1290.0,
-            tts=1350.0,
-            deal_bas_r=1320.0,
-        ),
-        ExchangeRate(
-            cur_unit="EUR",
-            cur_nm="Euro",
-            ttb=1400.0,
-            tts=1450.0,
-            deal_bas_r=1425.0,
-        ),
-    ]
-    mock_exchange_rate_client.fetch_rates.return_value = exchange_rates
+    # Setup: Active alerts (the fixture default) and exchange rates
+    koreaexim_api.respond(json=[USD_RATE_ITEM, EUR_RATE_ITEM])
     
-    with patch('functions.fetch_rates.get_alert_repository', return_value=mock_alert_repository):
-        response = await fetch_rates_async()
+    response = parse_lambda_response(await fetch_rates_async())
     
     # Assertions
-    assert response["statusCode"] == 200
-    body = json.loads(response["body"])
-    assert body["message"] == "Fetched rates for 2 currencies"
-    assert body["base_currency"] == "KRW"
-    assert set(body["currencies"]) == {"USD", "EUR"}
+    assert response.status == 200
+    assert response.body["message"] == "Fetched rates for 2 currencies"
+    assert response.body["base_currency"] == "KRW"
+    assert set(response.body["currencies"]) == {"USD", "EUR"}
     
     # Verify EventBridge was called with correct event
     mock_eventbridge.put_events.assert_called_once()
@@ -268,35 +375,19 @@ async def test_fetch_rates_success(
 
 async def test_fetch_rates_api_error(
     mock_alert_repository,
-    mock_exchange_rate_client,
+    koreaexim_api,
     mock_eventbridge,
 ):
     """Test fetch_rates when exchange rate API raises an error."""
-    # Setup: Active alerts exist
-    active_alert = Alert(
-        alert_id=str(uuid.uuid4()),
-        user_id="user-123",
-        telegram_chat_id="chat-123",
-        base_currency="KRW",
-        target_currency="USD",
-        target_rate=1300.0,
-        condition="above",
-        rate_type="TTS",
-        is_active=True,
-    )
-    mock_alert_repository.list_alerts.return_value = [active_alert]
-    
-    # Mock API error
-    mock_exchange_rate_client.fetch_rates.side_effect = Exception("API connection failed")
+    # Setup: Active alerts exist; mock API error
+    koreaexim_api.side_effect = httpx.ConnectError("API connection failed")
     
-    with patch('functions.fetch_rates.get_alert_repository', return_value=mock_alert_repository):
-        response = await fetch_rates_async()
+    response = parse_lambda_response(await fetch_rates_async())
     
     # Assertions
-    assert response["statusCode"] == 500
-    body = json.loads(response["body"])
-    assert "Failed to fetch rates" in body["error"]
-    assert "API connection failed" in body["error"]
+    assert response.status == 500
+    assert "Failed to fetch rates" in response.body["error"]
+    assert "API connection failed" in response.body["error"]
     
     # Should not call EventBridge on error
     mock_eventbridge.put_events.assert_not_called()
@@ -304,42 +395,74 @@ async def test_fetch_rates_api_error(
 
 async def test_fetch_rates_eventbridge_error(
     mock_alert_repository,
-    mock_exchange_rate_client,
+    koreaexim_api,
     mock_eventbridge,
 ):
     """Test fetch_rates when EventBridge put_events fails."""
-    # Setup: Active alerts and exchange rates
-    active_alert = Alert(
-        alert_id=str(uuid.uuid4()),
-        user_id="user-123",
-        telegram_chat_id="chat-123",
-        base_currency="KRW",
-        target_currency="USD",
-        target_rate=1300.0,
-        condition="above",
-        rate_type="TTS",
-        is_active=True,
-    )
-    mock_alert_repository.list_alerts.return_value = [active_alert]
-    
-    exchange_rates = [
-        ExchangeRate(
-            cur_unit="USD",
-            cur_nm="US Dollar",
-            ttb=1290.0,
-            tts=1350.0,
-            deal_bas_r=1320.0,
-        ),
-    ]
-    mock_exchange_rate_client.fetch_rates.return_value = exchange_rates
+    # Setup: Active alerts (the fixture default) and exchange rates
+    koreaexim_api.respond(json=[USD_RATE_ITEM])
     
     # Mock EventBridge error
     mock_eventbridge.put_events.side_effect = Exception("EventBridge error")
     
-    with patch('functions.fetch_rates.get_alert_repository', return_value=mock_alert_repository):
-        response = await fetch_rates_async()
+    response = parse_lambda_response(await fetch_rates_async())
     
     # Assertions
-    assert response["statusCode"] == 500
-    body = json.loads(response["body"])
-    assert "Failed to fetch rates" in body["error"]
+    assert response.status == 500
+    assert "Failed to fetch rates" in response.body["error"]
+
+
+async def test_fetch_rates_reuses_cached_rates_within_ttl(
+    mock_alert_repository,
+    koreaexim_api,
+    mock_eventbridge,
+):
+    """Test that a warm invocation on the same day skips the KoreaExim call."""
+    koreaexim_api.respond(json=[USD_RATE_ITEM])
+
+    first = await fetch_rates_async()
+    second = await fetch_rates_async()
+
+    assert first["statusCode"] == second["statusCode"] == 200
+    assert koreaexim_api.call_count == 1
+    assert mock_eventbridge.put_events.call_count == 2
+
+
+async def test_fetch_rates_active_check_stops_after_first_page(
+    alerts_table,
+    koreaexim_api,
+    mock_eventbridge,
+):
+    """Test that the active-alert check reads one scan page, not the whole table."""
+    from app.db.repositories.alert_repository import DynamoDBAlertRepository
+
+    repository = DynamoDBAlertRepository(table_name=alerts_table)
+    for index in range(3):
+        await repository.create_alert(Alert(
+            alert_id=f"alert-{index}",
+            user_id="user-123",
+            telegram_chat_id="chat-123",
+            base_currency="KRW",
+            target_currency="USD",
+            target_rate=1300.0,
+            condition="above",
+            rate_type="TTS",
+            is_active=True,
+        ))
+
+    # One item per page, so following LastEvaluatedKey would mean more scans
+    scan = repository.table.scan
+    scan_calls = []
+
+    def one_item_scan(**kwargs):
+        scan_calls.append(kwargs)
+        return scan(Limit=1, **kwargs)
+
+    repository.table.scan = one_item_scan
+    koreaexim_api.respond(json=[])
+
+    with patch('functions.fetch_rates.get_alert_repository', return_value=repository):
+        response = parse_lambda_response(await fetch_rates_async())
+
+    assert response.body["message"] == "No exchange rates available"
+    assert len(scan_calls) == 1
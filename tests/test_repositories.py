@@ -1,8 +1,12 @@
 
 import pytest
+import time_machine
 import uuid
+from datetime import UTC, datetime, timedelta
 from app.db.models.alert import Alert
+from app.db.models.user import User
 from app.db.repositories.alert_repository import DynamoDBAlertRepository
+from app.db.repositories.user_repository import DynamoDBUserRepository
 
 # Mark all tests in this file as asyncio
 pytestmark = pytest.mark.asyncio
@@ -70,18 +74,42 @@ async def test_list_alerts_by_user(alert_repository: DynamoDBAlertRepository, sa
     assert alert1.alert_id in alert_ids
     assert alert2.alert_id in alert_ids
 
+async def test_list_alerts_by_user_paginates(alert_repository: DynamoDBAlertRepository, sample_alert_data):
+    """Test paging through a user's alerts with the returned cursor."""
+    created_ids = set()
+    for _ in range(3):
+        alert_data = sample_alert_data.copy()
+        alert_data["alert_id"] = str(uuid.uuid4())
+        await alert_repository.create_alert(Alert(**alert_data))
+        created_ids.add(alert_data["alert_id"])
+
+    first_page, cursor = await alert_repository.list_alerts_by_user(
+        sample_alert_data["user_id"], limit=2
+    )
+    assert len(first_page) == 2
+    assert cursor is not None
+
+    second_page, _ = await alert_repository.list_alerts_by_user(
+        sample_alert_data["user_id"], limit=2, cursor=cursor
+    )
+    assert len(second_page) == 1
+
+    # Pages don't overlap and together cover every alert
+    assert {alert.alert_id for alert in first_page + second_page} == created_ids
+
 async def test_update_alert(alert_repository: DynamoDBAlertRepository, sample_alert_data):
     """Test updating an alert's attributes."""
     # Create an initial alert
     alert = Alert(**sample_alert_data)
     await alert_repository.create_alert(alert)
 
-    # Update the alert's target rate and condition
-    updated_alert = await alert_repository.update_alert(
-        alert_id=alert.alert_id,
-        target_rate=1350.5,
-        is_active=False
-    )
+    # Update the alert's target rate and condition a second later
+    with time_machine.travel(datetime.now(UTC) + timedelta(seconds=1), tick=False):
+        updated_alert = await alert_repository.update_alert(
+            alert_id=alert.alert_id,
+            target_rate=1350.5,
+            is_active=False
+        )
 
     # Assertions
     assert updated_alert is not None
@@ -89,6 +117,55 @@ async def test_update_alert(alert_repository: DynamoDBAlertRepository, sample_al
     assert updated_alert.is_active is False
     assert updated_alert.updated_at > updated_alert.created_at
 
+async def test_update_alert_rejects_other_owner(alert_repository: DynamoDBAlertRepository, sample_alert_data):
+    """Test that an owner-conditioned update leaves someone else's alert untouched."""
+    alert = Alert(**sample_alert_data)
+    await alert_repository.create_alert(alert)
+
+    result = await alert_repository.update_alert(
+        alert.alert_id, owner_id="someone-else", target_rate=999.0
+    )
+    assert result is None
+
+    unchanged = await alert_repository.get_alert(alert.alert_id)
+    assert unchanged.target_rate == sample_alert_data["target_rate"]
+
+    # Conditioned writes must not upsert alerts that don't exist
+    assert await alert_repository.update_alert("missing", owner_id="someone-else", is_active=False) is None
+    assert await alert_repository.get_alert("missing") is None
+
+async def test_empty_owner_update_does_not_write(alert_repository: DynamoDBAlertRepository, sample_alert_data):
+    """Test that an owner update with no fields checks ownership without touching updated_at."""
+    alert = Alert(**sample_alert_data)
+    await alert_repository.create_alert(alert)
+    before = await alert_repository.get_alert(alert.alert_id)
+
+    with time_machine.travel(datetime.now(UTC) + timedelta(seconds=1), tick=False):
+        unchanged = await alert_repository.update_alert(alert.alert_id, owner_id="test-user-123")
+
+    assert unchanged is not None
+    assert unchanged.updated_at == before.updated_at
+    assert await alert_repository.update_alert(alert.alert_id, owner_id="someone-else") is None
+    assert await alert_repository.update_alert("missing", owner_id="test-user-123") is None
+
+async def test_conditioned_writes_reraise_other_errors(monkeypatch, alert_repository: DynamoDBAlertRepository):
+    """Test that only a failed ownership condition is reported as a rejected write."""
+    from botocore.exceptions import ClientError
+
+    def throttled(**kwargs):
+        raise ClientError(
+            {"Error": {"Code": "ProvisionedThroughputExceededException", "Message": "Slow down"}},
+            "UpdateItem",
+        )
+
+    monkeypatch.setattr(alert_repository.table, "update_item", throttled)
+    monkeypatch.setattr(alert_repository.table, "delete_item", throttled)
+
+    with pytest.raises(ClientError):
+        await alert_repository.update_alert("any", owner_id="test-user-123", is_active=False)
+    with pytest.raises(ClientError):
+        await alert_repository.delete_alert("any", owner_id="test-user-123")
+
 async def test_delete_alert(alert_repository: DynamoDBAlertRepository, sample_alert_data):
     """Test deleting an alert."""
     # Create an alert
@@ -127,3 +204,101 @@ async def test_get_active_alerts_by_base_currency(alert_repository: DynamoDBAler
     assert len(active_alerts) == 1
     assert active_alerts[0].alert_id == active_alert.alert_id
     assert active_alerts[0].is_active is True
+
+async def test_get_active_alerts_for_currencies(alert_repository: DynamoDBAlertRepository, sample_alert_data):
+    """Test that only active alerts on the requested target currencies are returned."""
+    expected_ids = set()
+    for target_currency, is_active in [("USD", True), ("EUR", True), ("JPY", True), ("USD", False)]:
+        alert_data = sample_alert_data.copy()
+        alert_data["alert_id"] = str(uuid.uuid4())
+        alert_data["target_currency"] = target_currency
+        alert_data["is_active"] = is_active
+        await alert_repository.create_alert(Alert(**alert_data))
+        if is_active and target_currency in ("USD", "EUR"):
+            expected_ids.add(alert_data["alert_id"])
+
+    alerts = await alert_repository.get_active_alerts_for_currencies("KRW", {"USD", "EUR", "GBP"})
+
+    assert {alert.alert_id for alert in alerts} == expected_ids
+    assert all(alert.condition == "below" for alert in alerts)
+    assert await alert_repository.get_active_alerts_for_currencies("KRW", []) == []
+
+async def test_list_all_active_alerts_across_users(alert_repository: DynamoDBAlertRepository, sample_alert_data):
+    """Test the user-less iteration yields every active alert with all projected fields."""
+    for index in range(3):
+        alert_data = sample_alert_data.copy()
+        alert_data["alert_id"] = str(uuid.uuid4())
+        alert_data["user_id"] = f"user-{index}"
+        alert_data["is_active"] = index != 2
+        await alert_repository.create_alert(Alert(**alert_data))
+
+    active_alerts = [alert async for alert in alert_repository.iter_alerts(is_active=True)]
+
+    assert sorted(alert.user_id for alert in active_alerts) == ["user-0", "user-1"]
+    # "condition" is a reserved word and must survive the projection
+    assert all(alert.condition == "below" for alert in active_alerts)
+    assert all(alert.created_at is not None for alert in active_alerts)
+
+async def test_has_active_alerts(alert_repository: DynamoDBAlertRepository, sample_alert_data):
+    """Test the existence check ignores inactive alerts."""
+    assert await alert_repository.has_active_alerts() is False
+
+    await alert_repository.create_alert(Alert(**{**sample_alert_data, "is_active": False}))
+    assert await alert_repository.has_active_alerts() is False
+
+    await alert_repository.create_alert(Alert(**{**sample_alert_data, "alert_id": str(uuid.uuid4())}))
+    assert await alert_repository.has_active_alerts() is True
+
+async def test_get_alerts_batches_and_preserves_order(alert_repository: DynamoDBAlertRepository, sample_alert_data):
+    """Test batch fetching more ids than one BatchGetItem call allows."""
+    alert_ids = []
+    for _ in range(105):
+        alert_data = sample_alert_data.copy()
+        alert_data["alert_id"] = str(uuid.uuid4())
+        await alert_repository.create_alert(Alert(**alert_data))
+        alert_ids.append(alert_data["alert_id"])
+
+    requested = list(reversed(alert_ids)) + ["missing-id", alert_ids[0]]
+    alerts = await alert_repository.get_alerts(requested)
+
+    assert [alert.alert_id for alert in alerts] == list(reversed(alert_ids))
+    assert all(alert.condition == "below" for alert in alerts)
+
+async def test_update_user_returns_updated_user(users_table):
+    """Test update_user returns the post-update item straight from UpdateItem."""
+    user_repository = DynamoDBUserRepository(table_name=users_table)
+    user = User(
+        user_id=str(uuid.uuid4()),
+        email="user@example.com",
+        telegram_chat_id="chat-1",
+        hashed_password="hashed",
+    )
+    await user_repository.create_user(user)
+
+    updated = await user_repository.update_user(user.user_id, telegram_chat_id="chat-2")
+
+    assert updated.telegram_chat_id == "chat-2"
+    assert updated.email == "user@example.com"
+    assert updated.hashed_password == "hashed"
+    assert updated.updated_at is not None
+
+
+async def test_dax_alert_repository_uses_dax_resource(monkeypatch, alerts_table, sample_alert_data):
+    """Test that the DAX variant builds its table from the DAX resource."""
+    import boto3
+
+    from app.db.repositories import alert_repository as alert_repository_module
+
+    endpoints = []
+
+    def fake_dax_resource(endpoint_url):
+        endpoints.append(endpoint_url)
+        return boto3.resource("dynamodb")
+
+    monkeypatch.setattr(alert_repository_module, "get_dax_resource", fake_dax_resource)
+    repository = alert_repository_module.DaxAlertRepository("dax://cluster.example", table_name=alerts_table)
+
+    await repository.create_alert(Alert(**sample_alert_data))
+
+    assert endpoints == ["dax://cluster.example"]
+    assert (await repository.get_alert(sample_alert_data["alert_id"])).alert_id == sample_alert_data["alert_id"]
@@ -0,0 +1,116 @@
+import asyncio
+from datetime import timedelta
+
+import time_machine
+
+from app.core import security
+from app.core.security import (
+    aget_password_hash,
+    averify_password,
+    create_access_token,
+    decode_access_token,
+    get_password_hash,
+    verify_password,
+)
+
+# Hashes produced by the previous passlib CryptContext(schemes=["bcrypt"]) setup
+PASSLIB_HASH = "$2b$04$ZkcHo9fi2cWMHDo.HNtI/.xM62NsCK4fLKnV0LQ7VGZwYpVOqb/mm"  # "correct horse"
+# 85-byte password whose 72-byte cut splits a multi-byte character
+LONG_PASSWORD = "a" + "비밀번호" * 7
+PASSLIB_LONG_HASH = "$2b$04$9A8xgN5VyKUOvklQAf4h7.O6geqtgjif39F4gww3EvafTKDWzMG9a"
+
+
+def test_hash_and_verify_round_trip():
+    hashed = get_password_hash("securepass123")
+
+    assert hashed.startswith("$2b$")
+    assert verify_password("securepass123", hashed)
+    assert not verify_password("wrongpass", hashed)
+
+
+def test_verify_accepts_existing_passlib_hashes():
+    assert verify_password("correct horse", PASSLIB_HASH)
+    assert not verify_password("correct horse!", PASSLIB_HASH)
+    assert verify_password(LONG_PASSWORD, PASSLIB_LONG_HASH)
+
+
+def test_verify_rejects_malformed_hash():
+    assert not verify_password("anything", "not-a-bcrypt-hash")
+
+
+def test_verify_password_caches_recent_results(monkeypatch):
+    hashed = get_password_hash("securepass123")
+    assert verify_password("securepass123", hashed)
+
+    def fail_checkpw(*args):
+        raise AssertionError("bcrypt should not run for a cached verification")
+
+    monkeypatch.setattr(security.bcrypt, "checkpw", fail_checkpw)
+    assert verify_password("securepass123", hashed)
+
+
+def test_async_hash_and_verify_run_on_bcrypt_pool():
+    async def run():
+        hashed = await aget_password_hash("securepass123")
+        return hashed, await averify_password("securepass123", hashed), await averify_password("wrongpass", hashed)
+
+    hashed, accepted, rejected = asyncio.run(run())
+
+    assert hashed.startswith("$2b$")
+    assert accepted
+    assert not rejected
+
+
+# Issued by the previous python-jose implementation with SECRET_KEY="test-secret-key"
+JOSE_TOKEN = (
+    "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9."
+    "eyJzdWIiOiJ1c2VyLTEyMyIsImVtYWlsIjoidGVzdEBleGFtcGxlLmNvbSIsImV4cCI6NDEwMjQ0NDgwMH0."
+    "sI9KZH2tfpU-hOvXAIvvjbH8DCrLBtkq6G93Y8ydsms"
+)
+# Same claims signed with a different key
+FOREIGN_TOKEN = (
+    "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9."
+    "eyJzdWIiOiJ1c2VyLTEyMyIsImV4cCI6NDEwMjQ0NDgwMH0."
+    "WzPuiVohhK-26xXoUlSw-PqBsoqHWVX6D0Zi66lK0dM"
+)
+
+
+def test_access_token_round_trip():
+    token = create_access_token({"sub": "user-123", "email": "test@example.com"})
+
+    payload = decode_access_token(token)
+
+    assert payload["sub"] == "user-123"
+    assert payload["email"] == "test@example.com"
+    assert isinstance(payload["exp"], int)
+
+
+def test_decode_accepts_previously_issued_tokens():
+    assert decode_access_token(JOSE_TOKEN) == {
+        "sub": "user-123",
+        "email": "test@example.com",
+        "exp": 4102444800,
+    }
+
+
+def test_decode_rejects_invalid_tokens():
+    token = create_access_token({"sub": "user-123"})
+    header, _, signature = token.split(".")
+    tampered_payload = security._b64url_encode(b'{"sub":"admin","exp":4102444800}').decode()
+
+    assert decode_access_token(FOREIGN_TOKEN) is None
+    assert decode_access_token(f"{header}.{tampered_payload}.{signature}") is None
+    assert decode_access_token("not-a-jwt") is None
+    assert decode_access_token("a.b.c") is None
+    assert decode_access_token(create_access_token({"sub": "user-123"}, expires_delta=timedelta(seconds=-1))) is None
+
+
+def test_decode_rejects_expired_cached_token():
+    """A token verified earlier must still be rejected once it expires."""
+    token = create_access_token({"sub": "user-123"}, expires_delta=timedelta(minutes=5))
+
+    payload = decode_access_token(token)
+    assert payload["sub"] == "user-123"
+
+    with time_machine.travel(payload["exp"] + 1):
+        assert decode_access_token(token) is None